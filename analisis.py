@@ -0,0 +1,81 @@
+# analisis.py
+# Análisis en segundo plano para el cliente gráfico: un proceso aparte busca
+# con OthelloAI y devuelve la puntuación de cada movimiento según profundiza
+import multiprocessing
+
+from ia_cliente import OthelloAI
+
+
+def analysis_worker(conn, max_depth):
+    """Bucle del proceso de análisis.
+
+    Mensajes recibidos: ('analyze', id, tablero, jugador), ('idle', id) y
+    ('quit',). Tras cada profundidad completada envía
+    ('scores', id, profundidad, [[fila, columna, puntuación], ...]). Una
+    petición nueva interrumpe la que está en curso.
+    """
+    ai = OthelloAI(verbose=False, depth=max_depth)
+    request = conn.recv()
+    while request[0] != 'quit':
+        if request[0] != 'analyze':
+            request = conn.recv()
+            continue
+
+        _, request_id, board, player = request
+        if len(board) != ai.board_size:
+            ai = OthelloAI(board_size=len(board), verbose=False, depth=max_depth)
+        ai.set_player_color(player)
+        for depth in range(1, max_depth + 1):
+            scores = ai.analyze_moves(board, depth, should_stop=conn.poll)
+            if scores is None or conn.poll():
+                break  # Llegó una petición nueva
+            conn.send(('scores', request_id, depth, [[m[0], m[1], float(s)] for m, s in scores]))
+        # Si se interrumpió, la siguiente petición ya está esperando en la Pipe
+        request = conn.recv()
+    conn.close()
+
+
+class AnalysisWorker:
+    """Proceso de análisis controlado a través de una Pipe.
+
+    `conn` puede vigilarse con un selector: cada mensaje disponible es un
+    resultado parcial que se lee con `receive()`.
+    """
+
+    def __init__(self, max_depth=6):
+        self.max_depth = max_depth
+        self.request_id = 0
+        self.conn = None
+        self.process = None
+
+    def start(self):
+        # spawn: el hijo no hereda el estado de PyGame del proceso gráfico
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=analysis_worker, args=(child_conn, self.max_depth),
+                                       name="AnalysisWorker", daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def analyze(self, board, player):
+        self.request_id += 1
+        self.conn.send(('analyze', self.request_id, board, player))
+        return self.request_id
+
+    def idle(self):
+        self.request_id += 1
+        self.conn.send(('idle', self.request_id))
+
+    def receive(self):
+        return self.conn.recv()
+
+    def stop(self):
+        try:
+            self.conn.send(('quit',))
+        except (OSError, ValueError):
+            pass
+        if self.process:
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.conn.close()
@@ -0,0 +1,182 @@
+# anfitrion.py
+# Modo anfitrión de bots: un solo proceso y una sola conexión juegan muchas partidas
+#
+# Uso:
+#   python anfitrion.py --games 100 --engine depth=3 --prefix liga   # 100 salas liga-0..liga-99
+#   python anfitrion.py --games 100 --engine depth=2 --prefix liga   # el rival, en otro proceso
+#   python anfitrion.py --games 4                                    # se sienta en salas por defecto
+#   python anfitrion.py --engine depth=3,weights_file=pesos_ia.json  # con los pesos ajustados
+#
+# Cada partida es una sala del servidor identificada por game_id; todos los
+# mensajes viajan por la misma SelectorConnection. Las búsquedas de todas las
+# partidas se reparten en un Pool de procesos compartido: el hilo de E/S solo
+# encola trabajo y los resultados vuelven como movimientos por la conexión.
+import argparse
+import os
+import threading
+import time
+from multiprocessing import Pool
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from red import SelectorConnection
+from torneo import get_engine, parse_config
+
+
+def search_task(task):
+    """Búsqueda en un worker del pool (los motores se cachean por proceso)."""
+    game_id, version, config, board, player, clock = task
+    engine = get_engine(config)
+    engine.set_player_color(player)
+    if clock is None:
+        return game_id, version, engine.get_best_move(board)
+    # El tiempo que la tarea pasó en la cola también corre en el reloj
+    time_left, increment, queued_at = clock
+    time_left -= time.time() - queued_at
+    return game_id, version, engine.get_best_move(board, time_left=time_left, increment=increment)
+
+
+class BotGame:
+    """Estado de una partida del anfitrión."""
+
+    def __init__(self, game_id, color):
+        self.game_id = game_id
+        self.color = color
+        self.version = 0  # Cambia con cada game_state: descarta búsquedas obsoletas
+        self.game_state = None
+        self.finished = False
+
+
+class BotHost:
+    def __init__(self, host='localhost', port=5555, games=10, config=None, workers=None, prefix=None):
+        self.host = host
+        self.port = port
+        self.num_games = games
+        self.config = config or {'name': 'bot'}
+        self.workers = workers
+        self.prefix = prefix
+        self.games = {}  # game_id -> BotGame
+        self.results = {'wins': 0, 'losses': 0, 'draws': 0, 'abandoned': 0}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.pool = None
+        self.connection = SelectorConnection(self.handle_message, self.handle_closed)
+
+    # --- Mensajes (hilo de E/S) ---
+
+    def handle_message(self, message):
+        msg_type = message.get('type')
+        game_id = message.get('game_id')
+
+        if msg_type == 'welcome':
+            with self.lock:
+                self.games[game_id] = BotGame(game_id, message['player_color'])
+
+        elif msg_type == 'game_start' or msg_type == 'game_update':
+            self.update_game(game_id, message['game_state'])
+
+        elif msg_type == 'move_response':
+            if not message['success']:
+                print(f"❌ [{game_id}] Movimiento fallido: {message['message']}")
+
+        elif msg_type == 'opponent_disconnected':
+            self.finish_game(game_id, 'abandoned')
+
+        elif msg_type == 'error':
+            print(f"❌ [{game_id}] {message['message']}")
+            self.finish_game(game_id, None)
+
+    def handle_closed(self, closed_by_peer):
+        self.done.set()
+
+    def update_game(self, game_id, game_state):
+        with self.lock:
+            game = self.games.get(game_id)
+            if game is None or game.finished:
+                return
+            game.game_state = game_state
+            game.version += 1
+            version = game.version
+
+        if game_state['game_over']:
+            winner = game_state['winner']
+            self.finish_game(game_id, 'draws' if winner == 0 else 'wins' if winner == game.color else 'losses')
+        elif game_state['current_player'] == game.color and game_state['valid_moves']:
+            config = dict(self.config, board_size=game_state.get('board_size', len(game_state['board'])))
+            clocks = game_state.get('clocks')
+            clock = None
+            if clocks:
+                clock = (clocks['black' if game.color == 1 else 'white'], clocks['increment'], time.time())
+            task = (game_id, version, config, game_state['board'], game.color, clock)
+            self.pool.apply_async(search_task, (task,), callback=self.send_result,
+                                  error_callback=self.search_failed)
+
+    def finish_game(self, game_id, result):
+        with self.lock:
+            game = self.games.get(game_id)
+            if game is None or game.finished:
+                return
+            game.finished = True
+            if result:
+                self.results[result] += 1
+            finished = sum(1 for g in self.games.values() if g.finished)
+        if result:
+            print(f"🏁 [{game_id}] {result} ({finished}/{self.num_games})")
+        if finished >= self.num_games:
+            self.done.set()
+
+    # --- Resultados del pool (hilo de resultados del Pool) ---
+
+    def send_result(self, result):
+        game_id, version, move = result
+        with self.lock:
+            game = self.games.get(game_id)
+            if game is None or game.finished or game.version != version:
+                return  # La posición cambió mientras se buscaba
+            valid_moves = [tuple(m) for m in game.game_state['valid_moves']]
+        if move not in valid_moves:
+            move = valid_moves[0]
+        self.connection.send({'type': 'move', 'game_id': game_id, 'row': move[0], 'col': move[1]})
+
+    def search_failed(self, error):
+        print(f"❌ Error en la búsqueda: {error}")
+
+    def run(self):
+        start_time = time.time()
+        self.pool = Pool(self.workers)
+        try:
+            self.connection.connect(self.host, self.port)
+            print(f"✅ Conectado a {self.host}:{self.port}, pidiendo {self.num_games} partidas")
+            for i in range(self.num_games):
+                join = {'type': 'join'}
+                if self.prefix:
+                    join['game_id'] = f"{self.prefix}-{i}"
+                self.connection.send(join)
+            while not self.done.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("\n🛑 Anfitrión detenido")
+        finally:
+            self.connection.close()
+            self.pool.terminate()
+        print(f"📊 {self.results} en {time.time() - start_time:.1f}s")
+        return self.results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anfitrión de bots: muchas partidas por una sola conexión")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5555)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--engine', default='depth=3', help="configuración del motor, p. ej. 'engine=mcts,time_limit=0.5'")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--prefix', default=None, help="salas <prefijo>-0..N-1 (por defecto, salas libres)")
+    args = parser.parse_args()
+
+    print("=== 🤖 ANFITRIÓN DE BOTS OTHELLO ===")
+    host = BotHost(args.host, args.port, args.games, parse_config(args.engine, 'bot'), args.workers, args.prefix)
+    host.run()
+
+
+if __name__ == "__main__":
+    main()
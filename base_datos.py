@@ -0,0 +1,368 @@
+# base_datos.py
+# Base de datos de partidas con índice de posiciones
+#
+# Uso:
+#   python base_datos.py importar partidas.npz otras.npz --db partidas_db
+#   python base_datos.py consultar --moves f5d6c3 --db partidas_db
+#
+# Las partidas se guardan como en historial.GameArchive: todas las jugadas en
+# un único array de bytes (casilla = fila * 8 + columna) más el desplazamiento
+# de cada partida, junto con su resultado (fichas negras menos blancas).
+#
+# Al importar se reproducen todas las partidas a la vez con reglas.advance_batch
+# y se calcula un hash de 64 bits de cada posición alcanzada (con el jugador al
+# turno). El índice es la lista de (hash, partida, jugada) ordenada por hash,
+# en ficheros .npy que se abren proyectados en memoria: una consulta es una
+# búsqueda binaria (np.searchsorted) que solo lee las páginas que toca, así que
+# tarda milisegundos aunque haya millones de partidas. Las claves nuevas se
+# ordenan aparte y se intercalan en el índice ya ordenado.
+#
+# Cada partida tiene además un hash de 64 bits de sus jugadas (game_keys,
+# ordenado): las partidas que ya están en la base de datos, o repetidas dentro
+# de lo importado, se omiten, así que importar dos veces el mismo fichero no
+# duplica nada.
+import argparse
+import os
+import time
+
+import numpy as np
+
+import bitboard
+import reglas
+from historial import GameArchive, GameRecord
+from perft import parse_moves
+
+DB_DIR = 'partidas_db'
+IMPORT_CHUNK = 20000  # Partidas reproducidas a la vez al importar
+
+# Arrays de la base de datos (un fichero .npy por array)
+GAME_ARRAYS = ('moves', 'offsets', 'results')
+INDEX_ARRAYS = ('keys', 'games', 'plies', 'game_keys')
+
+# Constantes del hash de posiciones (mezclador splitmix64)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_WHITE_SEED = np.uint64(0x9E3779B97F4A7C15)
+_SIDE = np.uint64(0xD6E8FEB86659FD93)
+_GAME_SEED = np.uint64(0x2545F4914F6CDD1D)
+
+
+def _mix(x):
+    x = (x ^ (x >> np.uint64(30))) * _MIX_1
+    x = (x ^ (x >> np.uint64(27))) * _MIX_2
+    return x ^ (x >> np.uint64(31))
+
+
+def position_hash(black, white, players):
+    """Hash de 64 bits de un lote de posiciones (bitboards uint64 y jugador al turno)."""
+    black = np.asarray(black, dtype=np.uint64)
+    white = np.asarray(white, dtype=np.uint64)
+    keys = _mix(black ^ _mix(white ^ _WHITE_SEED))
+    return np.where(np.asarray(players) == 2, keys ^ _SIDE, keys)
+
+
+def game_hash(moves, offsets):
+    """Hash de 64 bits de las jugadas de cada partida (mismas jugadas, mismo hash)."""
+    lengths = np.diff(offsets)
+    keys = np.full(len(lengths), _GAME_SEED, dtype=np.uint64)
+    for ply in range(int(lengths.max(initial=0))):
+        playing = np.nonzero(lengths > ply)[0]
+        squares = moves[offsets[playing] + ply].astype(np.uint64)
+        keys[playing] = _mix(keys[playing] ^ (squares + np.uint64(1)))
+    return _mix(keys ^ lengths.astype(np.uint64))
+
+
+def _contains(sorted_keys, keys):
+    """Qué `keys` están en el array ordenado `sorted_keys`."""
+    index = np.searchsorted(sorted_keys, keys)
+    found = np.zeros(len(keys), dtype=bool)
+    inside = index < len(sorted_keys)
+    found[inside] = np.asarray(sorted_keys[index[inside]]) == keys[inside]
+    return found
+
+
+def _merge(sorted_keys, new_keys, *columns):
+    """Intercala claves nuevas en un array ya ordenado, con sus columnas asociadas.
+
+    Cada columna es un par (existente, nueva). Solo se ordenan las claves
+    nuevas; a igual clave las existentes quedan antes.
+    """
+    order = np.argsort(new_keys, kind='stable')
+    new_keys = new_keys[order]
+    positions = np.searchsorted(sorted_keys, new_keys, side='right')
+    merged = [np.insert(sorted_keys, positions, new_keys)]
+    for existing, new in columns:
+        merged.append(np.insert(existing, positions, new[order]))
+    return merged
+
+
+def replay_games(moves, offsets):
+    """Reproduce un lote de partidas a la vez.
+
+    Devuelve (hashes, partida, jugada) de cada posición alcanzada (incluidas
+    la inicial y la final), el resultado de cada partida y qué partidas son
+    válidas (las que tienen alguna jugada ilegal se descartan).
+    """
+    n = len(offsets) - 1
+    lengths = np.diff(offsets)
+    boards = reglas.initial_boards(n)
+    players = np.ones(n, dtype=np.int64)
+    valid = np.ones(n, dtype=bool)
+    keys, games, plies = [], [], []
+
+    for ply in range(int(lengths.max(initial=0)) + 1):
+        reached = np.nonzero(valid & (lengths >= ply))[0]
+        black, white = reglas.boards_to_bitboards(boards[reached])
+        keys.append(position_hash(black, white, players[reached]))
+        games.append(reached)
+        plies.append(np.full(len(reached), ply, dtype=np.uint8))
+
+        moving = reached[lengths[reached] > ply]
+        if len(moving) == 0:
+            break
+        squares = moves[offsets[moving] + ply].astype(np.int64)
+        rows, cols = squares // 8, squares % 8
+        old_boards = boards[moving]
+        new_boards, next_players, _ = reglas.advance_batch(old_boards, players[moving],
+                                                           np.stack([rows, cols], axis=1))
+        # Una jugada es legal si la casilla estaba vacía y voltea alguna ficha
+        changed = (new_boards != old_boards).reshape(len(moving), -1).sum(axis=1)
+        legal = (old_boards[np.arange(len(moving)), rows, cols] == 0) & (changed > 1)
+        valid[moving[~legal]] = False
+        boards[moving[legal]] = new_boards[legal]
+        players[moving[legal]] = next_players[legal]
+
+    keys, games, plies = np.concatenate(keys), np.concatenate(games), np.concatenate(plies)
+    kept = valid[games]
+    counts = reglas.disc_counts_batch(boards)
+    results = (counts[:, 0] - counts[:, 1]).astype(np.int8)
+    return keys[kept], games[kept], plies[kept], results, valid
+
+
+class GameDatabase:
+    """Partidas e índice de posiciones guardados en un directorio y proyectados en memoria."""
+
+    def __init__(self, path=DB_DIR):
+        self.path = path
+        self._load()
+
+    def _file(self, name):
+        return os.path.join(self.path, name + '.npy')
+
+    def _load(self):
+        if not os.path.exists(self._file('keys')):
+            self.moves = np.zeros(0, dtype=np.uint8)
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.results = np.zeros(0, dtype=np.int8)
+            self.keys = np.zeros(0, dtype=np.uint64)
+            self.games = np.zeros(0, dtype=np.uint32)
+            self.plies = np.zeros(0, dtype=np.uint8)
+            self.game_keys = np.zeros(0, dtype=np.uint64)
+            return
+        for name in GAME_ARRAYS + INDEX_ARRAYS:
+            setattr(self, name, np.load(self._file(name), mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    # --- Importación ---
+
+    def import_games(self, moves, offsets):
+        """Añade partidas (jugadas y desplazamientos como en GameArchive); devuelve cuántas se importaron.
+
+        Las partidas ilegales y las que ya están guardadas se omiten.
+        """
+        moves = np.asarray(moves, dtype=np.uint8)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        first_game = len(self)
+        new_moves, new_offsets, new_results = [], [], []
+        new_keys, new_games, new_plies, new_game_keys = [], [], [], []
+        imported = 0
+
+        for start in range(0, len(offsets) - 1, IMPORT_CHUNK):
+            chunk = offsets[start:start + IMPORT_CHUNK + 1]
+            chunk_moves = moves[chunk[0]:chunk[-1]]
+            chunk_offsets = chunk - chunk[0]
+            keys, games, plies, results, valid = replay_games(chunk_moves, chunk_offsets)
+
+            # Omitir las partidas ya guardadas, las de lotes anteriores y las repetidas en este
+            game_keys = game_hash(chunk_moves, chunk_offsets)
+            valid &= ~_contains(self.game_keys, game_keys)
+            if new_game_keys:
+                valid &= ~_contains(np.sort(np.concatenate(new_game_keys)), game_keys)
+            first = np.zeros(len(game_keys), dtype=bool)
+            first[np.unique(game_keys, return_index=True)[1]] = True
+            valid &= first
+            kept = valid[games]
+
+            # Renumerar las partidas válidas a continuación de las ya guardadas
+            numbers = first_game + imported + np.cumsum(valid) - 1
+            lengths = np.diff(chunk_offsets)
+            new_moves.append(chunk_moves[np.repeat(valid, lengths)])
+            new_offsets.append(np.cumsum(lengths[valid]))
+            new_results.append(results[valid])
+            new_keys.append(keys[kept])
+            new_games.append(numbers[games[kept]].astype(np.uint32))
+            new_plies.append(plies[kept])
+            new_game_keys.append(game_keys[valid])
+            imported += int(valid.sum())
+
+        if not imported:
+            return 0
+        # Los desplazamientos de cada lote empiezan donde acabó el anterior
+        chunk_starts = len(self.moves) + np.cumsum([0] + [len(m) for m in new_moves[:-1]])
+        new_offsets = [ends + chunk_start for ends, chunk_start in zip(new_offsets, chunk_starts)]
+
+        keys, games, plies = _merge(self.keys, np.concatenate(new_keys),
+                                    (self.games, np.concatenate(new_games)),
+                                    (self.plies, np.concatenate(new_plies)))
+        game_keys, = _merge(self.game_keys, np.concatenate(new_game_keys))
+        arrays = {
+            'moves': np.concatenate([self.moves] + new_moves),
+            'offsets': np.concatenate([self.offsets] + new_offsets),
+            'results': np.concatenate([self.results] + new_results),
+            'keys': keys,
+            'games': games,
+            'plies': plies,
+            'game_keys': game_keys,
+        }
+        self._save(arrays)
+        return imported
+
+    def import_archive(self, path):
+        """Importa un fichero de partidas de historial.GameArchive (p. ej. partidas.npz)."""
+        archive = GameArchive.load(path)
+        return self.import_games(archive.moves, archive.offsets)
+
+    def _save(self, arrays):
+        os.makedirs(self.path, exist_ok=True)
+        # Soltar las proyecciones antes de sustituir los ficheros
+        for name in GAME_ARRAYS + INDEX_ARRAYS:
+            setattr(self, name, None)
+        for name, array in arrays.items():
+            temporary = os.path.join(self.path, name + '.tmp.npy')
+            np.save(temporary, array)
+            os.replace(temporary, self._file(name))
+        self._load()
+
+    # --- Consultas ---
+
+    def _range(self, board, player):
+        """Tramo [low, high) del índice con la posición y `player` al turno."""
+        black, white = bitboard.from_board(board)
+        key = position_hash([black], [white], [player])[0]
+        return (np.searchsorted(self.keys, key, side='left'),
+                np.searchsorted(self.keys, key, side='right'))
+
+    def count(self, board, player):
+        """Veces que se alcanzó la posición con `player` al turno."""
+        low, high = self._range(board, player)
+        return int(high - low)
+
+    def lookup(self, board, player):
+        """(partidas, jugadas) de todas las veces que se alcanzó la posición con `player` al turno."""
+        low, high = self._range(board, player)
+        return np.asarray(self.games[low:high]), np.asarray(self.plies[low:high])
+
+    def games_with_position(self, board, player, limit=None):
+        """(partidas, jugadas, resultados) de las partidas que alcanzaron la posición.
+
+        Con `limit` solo se leen las `limit` primeras.
+        """
+        low, high = self._range(board, player)
+        if limit is not None:
+            high = min(high, low + limit)
+        games = np.asarray(self.games[low:high])
+        return games, np.asarray(self.plies[low:high]), np.asarray(self.results[games])
+
+    def move_stats(self, board, player):
+        """Jugadas elegidas desde la posición: frecuencia y resultados desde el punto de vista de `player`.
+
+        Devuelve una lista de diccionarios ordenada por número de partidas.
+        """
+        games, plies = self.lookup(board, player)
+        offsets = np.asarray(self.offsets)
+        continued = plies < offsets[games + 1] - offsets[games]  # La partida no acabó aquí
+        games, plies = games[continued], plies[continued]
+        squares = np.asarray(self.moves[offsets[games] + plies]).astype(np.int64)
+        results = np.asarray(self.results[games]).astype(np.int64)
+        if player == 2:
+            results = -results
+
+        size = bitboard.SIZE * bitboard.SIZE
+        count = np.bincount(squares, minlength=size)
+        wins = np.bincount(squares, weights=(results > 0).astype(float), minlength=size)
+        draws = np.bincount(squares, weights=(results == 0).astype(float), minlength=size)
+        total = np.bincount(squares, weights=results, minlength=size)
+        stats = []
+        for square in np.nonzero(count)[0]:
+            n = int(count[square])
+            stats.append({
+                'move': bitboard.to_move(int(square)),
+                'games': n,
+                'wins': int(wins[square]),
+                'draws': int(draws[square]),
+                'losses': n - int(wins[square]) - int(draws[square]),
+                'average': float(total[square]) / n,  # Diferencia de fichas media
+            })
+        stats.sort(key=lambda entry: -entry['games'])
+        return stats
+
+    def game(self, index):
+        """GameRecord de una partida, para reproducirla (p. ej. en el modo repetición de juego01)."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return GameRecord(np.asarray(self.moves[start:end]).tobytes())
+
+
+def _position_from_moves(text):
+    """Tablero y jugador al turno tras una secuencia de jugadas en notación 'f5d6c3'."""
+    board, player = reglas.initial_board(), 1
+    for move in parse_moves(text):
+        boards, players, _ = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+        board, player = boards[0], int(players[0])
+    return board, player
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Base de datos de partidas con búsqueda por posición")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('importar', help="importar ficheros de partidas (formato de historial.py)")
+    add.add_argument('files', nargs='+')
+    add.add_argument('--db', default=DB_DIR)
+
+    query = subparsers.add_parser('consultar', help="partidas y jugadas desde una posición")
+    query.add_argument('--moves', default='', help="jugadas desde el inicio, p. ej. f5d6c3")
+    query.add_argument('--db', default=DB_DIR)
+    query.add_argument('--limit', type=int, default=10, help="partidas de ejemplo a listar")
+
+    args = parser.parse_args()
+    database = GameDatabase(args.db)
+
+    if args.command == 'importar':
+        for path in args.files:
+            start_time = time.time()
+            imported = database.import_archive(path)
+            print(f"💾 {imported} partidas de {path} importadas ({time.time() - start_time:.1f}s); "
+                  f"total {len(database)}")
+        return
+
+    board, player = _position_from_moves(args.moves)
+    start_time = time.time()
+    count = database.count(board, player)
+    games, plies, results = database.games_with_position(board, player, args.limit)
+    stats = database.move_stats(board, player)
+    elapsed = (time.time() - start_time) * 1000
+    print(f"🔎 {count} partidas alcanzaron la posición ({elapsed:.1f} ms, {len(database)} partidas)")
+    for game, ply, result in zip(games, plies, results):
+        print(f"   partida {game}, jugada {ply}, resultado {result:+d}")
+    if stats:
+        print("📊 Jugadas desde la posición (resultados para el jugador al turno):")
+    for entry in stats:
+        row, col = entry['move']
+        print(f"   {'abcdefgh'[col]}{row + 1}: {entry['games']:6d} partidas  "
+              f"+{entry['wins']} ={entry['draws']} -{entry['losses']}  media {entry['average']:+.1f}")
+
+
+if __name__ == "__main__":
+    main()
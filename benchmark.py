@@ -0,0 +1,173 @@
+# benchmark.py
+# Benchmark de OthelloAI.get_best_move sobre posiciones fijas, con umbral de regresión
+#
+# Uso:
+#   python benchmark.py --depth 4 --save-baseline       # guardar la referencia de esta máquina
+#   python benchmark.py --depth 4 --threshold 10        # falla si los nodos/s caen más de un 10%
+#   python benchmark.py --time 60 --probcut probcut.json  # búsqueda normal frente a selectiva
+#
+# Para cada posición se lanza una búsqueda (profundización iterativa hasta d)
+# y se registran nodos, nodos/s, tiempo acumulado hasta alcanzar cada
+# profundidad y el movimiento elegido. La referencia depende de la
+# máquina, así que cada entorno guarda la suya.
+#
+# Con --time cada posición se busca con el mismo reloj (sin profundidad fija)
+# con y sin ProbCut, y se compara la profundidad alcanzada y el movimiento.
+import argparse
+import json
+import os
+import sys
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from ia_cliente import PROBCUT_FILE, OthelloAI
+from perft import POSITIONS, position_from_moves
+
+BASELINE_FILE = 'benchmark_baseline.json'
+
+# Posiciones de apertura, medio juego y final
+BENCH_POSITIONS = ['inicio', 'apertura', 'medio', 'medio2', 'final']
+
+
+def benchmark_position(ai, board, player, depth):
+    ai.set_player_color(player)
+    ai.max_depth = depth
+    move = ai.get_best_move(board.tolist())
+    stats = ai.last_stats
+    return {
+        'nodes': stats.nodes,
+        'time': stats.time,
+        'nps': stats.nodes / max(stats.time, 1e-9),
+        'depth_times': [round(t, 6) for t in stats.depth_times],
+        'move': list(move) if move else None,
+    }
+
+
+def run_benchmark(depth, positions=BENCH_POSITIONS, weights_file=''):
+    ai = OthelloAI(verbose=False, weights_file=weights_file)
+    results = {}
+    for name in positions:
+        board, player = position_from_moves(POSITIONS[name][0])
+        results[name] = benchmark_position(ai, board, player, depth)
+    total_nodes = sum(r['nodes'] for r in results.values())
+    total_time = sum(r['time'] for r in results.values())
+    return {
+        'depth': depth,
+        'positions': results,
+        'total_nodes': total_nodes,
+        'nps': total_nodes / max(total_time, 1e-9),
+    }
+
+
+def run_timed_comparison(time_left, positions=BENCH_POSITIONS, weights_file='',
+                         probcut_file=PROBCUT_FILE, confidence=1.0):
+    """Búsqueda normal frente a selectiva con el mismo reloj en cada posición."""
+    if not os.path.exists(probcut_file):
+        print(f"⚠️ No existe {probcut_file}; créalo con 'entrenamiento.py probcut'")
+        return None
+    engines = {
+        'normal': OthelloAI(verbose=False, weights_file=weights_file),
+        'selectiva': OthelloAI(verbose=False, weights_file=weights_file, selective=True,
+                               probcut_file=probcut_file, probcut_confidence=confidence),
+    }
+    if not engines['selectiva'].probcut:
+        print(f"⚠️ {probcut_file} no tiene una calibración válida para este motor")
+        return None
+    results = {}
+    for name in positions:
+        board, player = position_from_moves(POSITIONS[name][0])
+        results[name] = {}
+        for label, ai in engines.items():
+            ai.set_player_color(player)
+            move = ai.get_best_move(board.tolist(), time_left=time_left)
+            stats = ai.last_stats
+            results[name][label] = {
+                'depth': stats.depth,
+                'nodes': stats.nodes,
+                'time': stats.time,
+                'move': list(move) if move else None,
+            }
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Compara con la referencia; devuelve la lista de regresiones encontradas."""
+    regressions = []
+    if baseline['depth'] != current['depth']:
+        print(f"⚠️ La referencia es de profundidad {baseline['depth']}, no se compara")
+        return regressions
+
+    change = (current['nps'] - baseline['nps']) / baseline['nps'] * 100
+    print(f"📊 Nodos/s: {current['nps']:,.0f} (referencia {baseline['nps']:,.0f}, {change:+.1f}%)")
+    if change < -threshold:
+        regressions.append(f"rendimiento {change:+.1f}% (umbral -{threshold}%)")
+
+    for name, result in current['positions'].items():
+        reference = baseline['positions'].get(name)
+        if not reference:
+            continue
+        if result['move'] != reference['move']:
+            print(f"⚠️ {name}: movimiento {result['move']} (referencia {reference['move']})")
+        if result['nodes'] != reference['nodes']:
+            print(f"ℹ️ {name}: {result['nodes']} nodos (referencia {reference['nodes']})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de OthelloAI")
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--threshold', type=float, default=10.0, help="regresión máxima de nodos/s en %%")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--weights', default='', help="fichero de pesos de la IA (por defecto los de serie)")
+    parser.add_argument('--time', type=float, default=None,
+                        help="reloj en segundos: compara la búsqueda normal con la selectiva")
+    parser.add_argument('--probcut', default=PROBCUT_FILE, help="calibración de ProbCut para --time")
+    parser.add_argument('--confidence', type=float, default=1.0, help="confianza de ProbCut para --time")
+    args = parser.parse_args()
+
+    if args.time is not None:
+        print(f"=== ⏱️ NORMAL FRENTE A SELECTIVA ({args.time:g}s de reloj) ===")
+        results = run_timed_comparison(args.time, weights_file=args.weights,
+                                       probcut_file=args.probcut, confidence=args.confidence)
+        if results is None:
+            sys.exit(1)
+        for name, result in results.items():
+            normal, selective = result['normal'], result['selectiva']
+            same = '' if normal['move'] == selective['move'] else '  ⚠️ movimiento distinto'
+            print(f"{name:>9}: prof. {normal['depth']} -> {selective['depth']}  "
+                  f"{normal['nodes']:>8} -> {selective['nodes']:>8} nodos  "
+                  f"mov={normal['move']} -> {selective['move']}{same}")
+        gain = sum(r['selectiva']['depth'] - r['normal']['depth'] for r in results.values()) / len(results)
+        print(f"⚡ Profundidad media ganada: {gain:+.2f}")
+        return
+
+    print("=== ⏱️ BENCHMARK OTHELLO AI ===")
+    current = run_benchmark(args.depth, weights_file=args.weights)
+    for name, result in current['positions'].items():
+        times = ' '.join(f"d{d + 1}={t:.3f}s" for d, t in enumerate(result['depth_times']))
+        print(f"{name:>9}: {result['nodes']:>8} nodos {result['nps']:>9,.0f} n/s "
+              f"mov={result['move']}  {times}")
+    print(f"⚡ Total: {current['total_nodes']} nodos, {current['nps']:,.0f} nodos/s")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"💾 Referencia guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No existe {args.baseline}; usa --save-baseline para crearla")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print("❌ Regresión: " + "; ".join(regressions))
+        sys.exit(1)
+    print("✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
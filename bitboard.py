@@ -0,0 +1,212 @@
+# bitboard.py
+# Reglas de Othello sobre bitboards (enteros de Python de ancho arbitrario)
+#
+# El bit `fila * N + columna` representa una casilla. Cada jugador tiene su
+# propio bitboard; generar movimientos y voltear fichas son unas pocas
+# operaciones de desplazamiento y máscara por dirección, sin recorrer casillas.
+# Como los enteros de Python no tienen tamaño fijo, el mismo código sirve para
+# 8x8, 10x10, 12x12 o 16x16: cada tamaño tiene su Geometry con sus máscaras.
+# Las funciones de módulo son las del tablero estándar de 8x8.
+from functools import lru_cache
+
+import numpy as np
+
+
+class Geometry:
+    """Máscaras y operaciones de bitboard para un tablero de size x size."""
+
+    def __init__(self, size):
+        self.size = size
+        self.squares = size * size
+        self.full = (1 << self.squares) - 1
+        first_col = sum(1 << (row * size) for row in range(size))
+        last_col = first_col << (size - 1)
+        self.not_col_first = self.full & ~first_col
+        self.not_col_last = self.full & ~last_col
+        last = size - 1
+        self.corners = (1 << 0) | (1 << last) | (1 << (last * size)) | (1 << (self.squares - 1))
+        # (desplazamiento, máscara tras desplazar) para las 8 direcciones
+        self.shifts = [
+            (1, self.not_col_first),          # Este
+            (-1, self.not_col_last),          # Oeste
+            (size, self.full),                # Sur
+            (-size, self.full),               # Norte
+            (size + 1, self.not_col_first),   # Sureste
+            (size - 1, self.not_col_last),    # Suroeste
+            (-(size - 1), self.not_col_first),  # Noreste
+            (-(size + 1), self.not_col_last),   # Noroeste
+        ]
+
+        # Estabilidad: los 4 ejes (pares de direcciones opuestas), las casillas
+        # que tienen pared en cada eje y las líneas completas de cada eje
+        first_row = (1 << size) - 1
+        last_row = first_row << (last * size)
+        border = first_col | last_col | first_row | last_row
+        self.axes = [
+            (self.shifts[0], self.shifts[1], first_col | last_col),  # Horizontal
+            (self.shifts[2], self.shifts[3], first_row | last_row),  # Vertical
+            (self.shifts[4], self.shifts[7], border),                # Diagonal principal
+            (self.shifts[5], self.shifts[6], border),                # Diagonal secundaria
+        ]
+        rows = [first_row << (r * size) for r in range(size)]
+        cols = [first_col << c for c in range(size)]
+        diagonals, antidiagonals = {}, {}
+        for row in range(size):
+            for col in range(size):
+                bit = 1 << (row * size + col)
+                diagonals[row - col] = diagonals.get(row - col, 0) | bit
+                antidiagonals[row + col] = antidiagonals.get(row + col, 0) | bit
+        self.axis_lines = [rows, cols, list(diagonals.values()), list(antidiagonals.values())]
+
+        # Saltos del relleno Kogge-Stone: 1, 2, 4... casillas hasta cubrir
+        # la cadena más larga posible de fichas rivales (N - 2)
+        self.fill_steps = []
+        covered, step = 0, 1
+        while covered < size - 2:
+            self.fill_steps.append(step)
+            covered += step
+            step *= 2
+
+    def shift(self, bits, amount, mask):
+        if amount > 0:
+            return (bits << amount) & mask
+        return (bits >> -amount) & mask
+
+    def legal_moves(self, own, opp):
+        """Bitboard con las casillas donde `own` puede jugar."""
+        empty = ~(own | opp) & self.full
+        moves = 0
+        for amount, mask in self.shifts:
+            # Relleno Kogge-Stone: cada ronda duplica la longitud de las cadenas
+            # de fichas rivales cubiertas, así hacen falta log2(N) rondas y no N.
+            # `pro` solo contiene casillas a las que se llega sin dar la vuelta
+            # por el borde, lo que vale también para los saltos de 2, 4... casillas.
+            gen = own
+            pro = opp & mask
+            if amount > 0:
+                for step in self.fill_steps:
+                    gen |= pro & (gen << amount * step)
+                    pro &= pro << amount * step
+                moves |= ((gen & opp) << amount) & mask & empty
+            else:
+                for step in self.fill_steps:
+                    gen |= pro & (gen >> -amount * step)
+                    pro &= pro >> -amount * step
+                moves |= ((gen & opp) >> -amount) & mask & empty
+        return moves
+
+    def flips(self, own, opp, move_bit):
+        """Fichas rivales que se voltean al jugar en `move_bit`."""
+        flipped = 0
+        for amount, mask in self.shifts:
+            line = 0
+            if amount > 0:
+                cursor = (move_bit << amount) & mask
+                while cursor & opp:
+                    line |= cursor
+                    cursor = (cursor << amount) & mask
+            else:
+                cursor = (move_bit >> -amount) & mask
+                while cursor & opp:
+                    line |= cursor
+                    cursor = (cursor >> -amount) & mask
+            if cursor & own:
+                flipped |= line
+        return flipped
+
+    def play(self, own, opp, index):
+        """Juega en la casilla `index` y devuelve los nuevos (own, opp)."""
+        move_bit = 1 << index
+        flipped = self.flips(own, opp, move_bit)
+        return own | move_bit | flipped, opp & ~flipped
+
+    def stable(self, own, opp):
+        """Fichas de `own` que ya no se pueden voltear.
+
+        Una ficha es estable en un eje si su línea en ese eje está llena, si
+        tiene pared a un lado o si su vecina en el eje es una ficha propia
+        estable. Se parte de las fichas estables sin vecinas (esquinas y
+        líneas llenas) y se rellena hacia dentro hasta que no cambia nada.
+        Es una cota inferior: puede no detectar alguna ficha estable.
+        """
+        filled = own | opp
+        safe = []
+        for (_, _, wall), lines in zip(self.axes, self.axis_lines):
+            for line in lines:
+                if filled & line == line:
+                    wall |= line
+            safe.append(wall)
+
+        stable = 0
+        while True:
+            new = own
+            for ((a, mask_a), (b, mask_b), _), axis_safe in zip(self.axes, safe):
+                # a > 0 y b < 0 en los cuatro ejes
+                new &= axis_safe | ((stable << a) & mask_a) | ((stable >> -b) & mask_b)
+            if new == stable:
+                return stable
+            stable = new
+
+    def from_board(self, board):
+        """Tablero (lista o array NxN, 0/1/2) -> (negras, blancas)."""
+        flat = np.asarray(board).ravel()
+        return _pack_bits(flat == 1), _pack_bits(flat == 2)
+
+    def to_array(self, black, white):
+        """(negras, blancas) -> array NxN con 0/1/2."""
+        nbytes = (self.squares + 7) // 8
+        black_bits = np.unpackbits(np.frombuffer(black.to_bytes(nbytes, 'little'), dtype=np.uint8),
+                                   bitorder='little')[:self.squares]
+        white_bits = np.unpackbits(np.frombuffer(white.to_bytes(nbytes, 'little'), dtype=np.uint8),
+                                   bitorder='little')[:self.squares]
+        board = black_bits.astype(np.int8) + 2 * white_bits.astype(np.int8)
+        return board.reshape(self.size, self.size)
+
+    def to_board(self, black, white):
+        """(negras, blancas) -> lista de listas NxN con 0/1/2."""
+        return self.to_array(black, white).tolist()
+
+    def to_move(self, index):
+        return divmod(index, self.size)
+
+    def to_index(self, row, col):
+        return row * self.size + col
+
+    def move_list(self, moves):
+        """Bitboard de movimientos -> lista de (fila, columna)."""
+        return [divmod(index, self.size) for index in iter_bits(moves)]
+
+
+def _pack_bits(flags):
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+
+@lru_cache(maxsize=None)
+def geometry(size):
+    return Geometry(size)
+
+
+def iter_bits(bits):
+    """Índices de los bits activos, de menor a mayor."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+# --- Tablero estándar de 8x8 ---
+
+SIZE = 8
+STANDARD = geometry(SIZE)
+FULL = STANDARD.full
+NOT_COL_FIRST = STANDARD.not_col_first  # Todo menos la columna 0
+NOT_COL_LAST = STANDARD.not_col_last    # Todo menos la columna 7
+
+legal_moves = STANDARD.legal_moves
+flips = STANDARD.flips
+play = STANDARD.play
+stable = STANDARD.stable
+from_board = STANDARD.from_board
+to_board = STANDARD.to_board
+to_move = STANDARD.to_move
+to_index = STANDARD.to_index
@@ -0,0 +1,119 @@
+# cache_compartido.py
+# Tabla de transposición persistente y compartida entre procesos de IA
+#
+# El fichero es una tabla hash de tamaño fijo proyectada en memoria (mmap):
+# cada entrada son dos uint64 (clave ^ datos, datos). Varios procesos pueden
+# leer y escribir a la vez sin cerrojos: si dos escrituras se mezclan, la
+# comprobación clave ^ datos deja de cuadrar y la entrada simplemente se
+# ignora. Así los resultados de búsqueda se acumulan entre partidas y entre
+# procesos (clientes IA, torneos, análisis).
+#
+# Las puntuaciones se guardan siempre desde el punto de vista de las negras,
+# de modo que un proceso que juega con blancas aprovecha lo que buscó otro
+# que jugaba con negras.
+import os
+import struct
+import zlib
+
+import numpy as np
+
+CACHE_FILE = 'cache_ia.bin'
+DEFAULT_ENTRIES = 1 << 20  # 16 MB
+
+# Tipo de cota de la puntuación guardada
+EXACT, LOWER, UPPER = 1, 2, 3
+
+NO_MOVE = 0xFFFF
+PASS_MOVE = 0xFFFE
+
+# Claves Zobrist con semilla fija: todos los procesos deben calcular las mismas
+# (hasta 16x16 casillas)
+_rng = np.random.default_rng(0x07E110)
+ZOBRIST = _rng.integers(1, 2 ** 63, size=(3, 256), dtype=np.uint64)
+ZOBRIST[0] = 0  # Las casillas vacías no aportan
+ZOBRIST_SIDE = int(_rng.integers(1, 2 ** 63, dtype=np.uint64))
+
+
+def position_key(board, player, salt=0):
+    """Clave Zobrist de 64 bits de un tablero NxN (0/1/2) con `player` al turno."""
+    flat = np.asarray(board).ravel()
+    key = int(np.bitwise_xor.reduce(ZOBRIST[flat, np.arange(flat.size)]))
+    if player == 2:
+        key ^= ZOBRIST_SIDE
+    return key ^ salt
+
+
+def weights_salt(*values):
+    """Sal de 64 bits a partir de los pesos de evaluación.
+
+    Se mezcla en la clave para que motores con pesos distintos no se
+    confundan con las puntuaciones de los demás dentro del mismo fichero.
+    """
+    data = b''.join(np.asarray(v, dtype=np.float64).tobytes() for v in values)
+    return (zlib.crc32(data) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+
+
+def _pack(depth, bound, move, score):
+    score_bits = struct.unpack('<I', struct.pack('<f', score))[0]
+    return (score_bits << 32) | (move << 16) | (bound << 8) | depth
+
+
+def _unpack(data):
+    depth = data & 0xFF
+    bound = (data >> 8) & 0xFF
+    move = (data >> 16) & 0xFFFF
+    score = struct.unpack('<f', struct.pack('<I', data >> 32))[0]
+    return depth, bound, move, score
+
+
+class SharedCache:
+    """Tabla hash (posición -> profundidad, puntuación, cota, mejor movimiento) en un fichero mmap."""
+
+    def __init__(self, path=CACHE_FILE, entries=DEFAULT_ENTRIES):
+        self.path = path
+        # 'a+b' no trunca: si otro proceso ya creó el fichero se respeta su tamaño
+        with open(path, 'a+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < 16:
+                f.truncate(entries * 16)
+                size = entries * 16
+        self.entries = size // 16
+        self.table = np.memmap(path, dtype=np.uint64, mode='r+', shape=(self.entries, 2))
+
+    def probe(self, key):
+        """(profundidad, cota, movimiento, puntuación para negras) o None."""
+        slot = self.table[key % self.entries]
+        check, data = int(slot[0]), int(slot[1])
+        if not data or check ^ data != key:
+            return None  # Vacía, de otra posición o escritura a medias
+        return _unpack(data)
+
+    def store(self, key, depth, bound, move, score):
+        """Guarda una entrada; no pisa una búsqueda más profunda de la misma posición."""
+        index = key % self.entries
+        slot = self.table[index]
+        check, data = int(slot[0]), int(slot[1])
+        if data and check ^ data == key and (data & 0xFF) > depth:
+            return
+        data = _pack(min(depth, 0xFF), bound, move, score)
+        self.table[index] = (key ^ data, data)
+
+    def flush(self):
+        self.table.flush()
+
+    def close(self):
+        self.table.flush()
+        del self.table
+
+
+def encode_move(move):
+    """(fila, columna) / None (pase) -> valor de 16 bits (fila << 8 | columna)."""
+    if move is None:
+        return PASS_MOVE
+    return (move[0] << 8) | move[1]
+
+
+def decode_move(value):
+    if value == NO_MOVE or value == PASS_MOVE:
+        return None
+    return divmod(value, 256)
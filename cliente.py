@@ -2,17 +2,17 @@
 import pygame
 import sys
 import numpy as np
-import socket
-import json
-import threading
 import time
 
-# Constantes
+import bitboard
+from analisis import AnalysisWorker
+from red import SelectorConnection
+from renderizado import FrameScheduler, TextCache, headless_requested, init_pygame, load_logo
+
+# Constantes (el tamaño de las casillas se deriva del tablero que envía el servidor)
 WIDTH, HEIGHT = 800, 800
 BOARD_SIZE = 8
-CELL_SIZE = WIDTH // BOARD_SIZE
-DOT_RADIUS = CELL_SIZE // 2 - 5
-HIGHLIGHT_RADIUS = CELL_SIZE // 2 - 10
+INFO_HEIGHT = 60
 
 # Colores
 BACKGROUND = (0, 128, 0)
@@ -23,43 +23,131 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 HIGHLIGHT = (255, 255, 0, 100)
+DISC_BORDER = (100, 100, 100)
+
+# Estados de casilla para el renderizado por regiones sucias
+EMPTY_CELL = 0
+MOVE_CELL = 3  # casilla vacía resaltada como movimiento válido
+
+# Eventos propios con los que el hilo de red entrega mensajes al bucle principal
+NET_MESSAGE = pygame.event.custom_type()
+NET_CLOSED = pygame.event.custom_type()
+ANALYSIS_EVENT = pygame.event.custom_type()
+CLOCK_TICK = pygame.event.custom_type()  # Refresco de los relojes mientras corren
+
+
+def state_hash(game_state):
+    """Huella de la parte del estado que predice el cliente (tablero, turno y fin de partida)."""
+    board = tuple(cell for row in game_state['board'] for cell in row)
+    return hash((board, game_state['current_player'], game_state['game_over']))
 
 
 class GameClient:
-    def __init__(self, host='localhost', port=5555):
+    def __init__(self, host='localhost', port=5555, headless=False, analysis=False):
+        start_time = time.perf_counter()
         self.host = host
         self.port = port
-        self.socket = None
+        self.connection = None
         self.player_color = None
         self.game_state = None
         self.connected = False
         self.connection_status = "Desconectado"
         self.last_error = ""
         self.waiting_for_opponent = True
+        self.headless = headless
 
-        # Estado inicial del tablero
-        self.initialize_default_board()
+        # Análisis en segundo plano (proceso aparte) con puntuación por movimiento
+        self.analysis = None
+        self.analysis_scores = {}
+        self.analysis_depth = 0
+
+        # Relojes del servidor: valores del último game_state y cuándo llegó
+        self.clocks_received_at = 0.0
 
-        # PyGame
-        pygame.init()
+        # Jugada optimista: se muestra al instante con las reglas locales y se
+        # concilia con el servidor (último estado confirmado, con el instante en
+        # que llegaron sus relojes, y huella predicha)
+        self.confirmed_state = None  # (game_state, clocks_received_at)
+        self.pending_move = None  # (fila, columna, state_hash del estado predicho)
+
+        # PyGame (en modo headless: drivers dummy de SDL, sin audio ni assets)
+        init_pygame(headless)
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Sitemas Inteligentes - Cliente")
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(60)
         self.font = pygame.font.SysFont('Arial', 24)
         self.small_font = pygame.font.SysFont('Arial', 18)
         self.big_font = pygame.font.SysFont('Arial', 36, bold=True)
+        self.title_font = pygame.font.SysFont('Arial', 28, bold=True)
+        self.text_cache = TextCache()
 
         # Logo
-        self.logo = pygame.image.load("intro.png")
-        self.logo = pygame.transform.scale(self.logo, (80, 80))
-
-        pygame.mixer.music.load('musica.mp3')
-        pygame.mixer.music.play(-1)
+        self.logo = load_logo(headless)
+
+        if not headless:
+            pygame.mixer.music.load('musica.mp3')
+            pygame.mixer.music.play(-1)
+
+        # Capas y sprites pre-renderizados (dependen del tamaño del tablero)
+        self.set_board_size(BOARD_SIZE)
+        self.build_render_cache()
+        self.rendered_cells = None  # None = hace falta un redibujado completo
+        self.rendered_info = None
+        self.waiting_key = None
+
+        if analysis:
+            self.start_analysis()
+
+        self.startup_time = time.perf_counter() - start_time
+        print(f"⏱️ Cliente inicializado en {self.startup_time * 1000:.0f} ms{' (headless)' if headless else ''}")
+
+    def set_board_size(self, board_size):
+        """Recalcula las medidas de las casillas para un tablero de board_size x board_size."""
+        self.board_size = board_size
+        self.cell_size = WIDTH // board_size
+        self.dot_radius = self.cell_size // 2 - 5
+        self.highlight_radius = self.cell_size // 2 - 10
+        # La barra de información se superpone a las primeras filas del tablero
+        self.info_rows = -(-INFO_HEIGHT // self.cell_size)
+        self.info_rect = pygame.Rect(0, 0, WIDTH, self.info_rows * self.cell_size)
+        self.initialize_default_board()
 
+    def update_board_size(self):
+        """Adapta el renderizado si el servidor juega con otro tamaño de tablero."""
+        board_size = self.game_state.get('board_size', len(self.game_state['board']))
+        if board_size != self.board_size:
+            print(f"📐 Tablero de {board_size}x{board_size}")
+            self.set_board_size(board_size)
+            self.build_render_cache()
+            self.invalidate_render()
+
+    def update_clocks(self, received_at=None):
+        """Con reloj en marcha se redibuja la barra de información varias veces por segundo.
+
+        `received_at` es el instante al que corresponden los relojes del estado
+        (por defecto, ahora).
+        """
+        self.clocks_received_at = time.monotonic() if received_at is None else received_at
+        running = self.game_state.get('clocks') and not self.game_state['game_over']
+        pygame.time.set_timer(CLOCK_TICK, 200 if running else 0)
+
+    def clock_texts(self):
+        """(negras, blancas) como m:ss, descontando lo que lleva el jugador al turno."""
+        clocks = self.game_state.get('clocks') if self.game_state else None
+        if not clocks:
+            return None
+        texts = []
+        for player, key in ((1, 'black'), (2, 'white')):
+            remaining = clocks[key]
+            if player == self.game_state['current_player'] and not self.game_state['game_over']:
+                remaining -= time.monotonic() - self.clocks_received_at
+            seconds = max(int(remaining + 0.999), 0)
+            texts.append(f"{seconds // 60}:{seconds % 60:02d}")
+        return tuple(texts)
 
     def initialize_default_board(self):
-        self.default_board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
-        mid = BOARD_SIZE // 2
+        self.default_board = np.zeros((self.board_size, self.board_size), dtype=int)
+        mid = self.board_size // 2
         self.default_board[mid - 1][mid - 1] = 2
         self.default_board[mid][mid] = 2
         self.default_board[mid - 1][mid] = 1
@@ -70,20 +158,19 @@ class GameClient:
             self.connection_status = "Conectando..."
             self.last_error = ""
 
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(10)
-            self.socket.connect((self.host, self.port))
-            self.socket.settimeout(0.5)
+            # El selector vive en su propio hilo de E/S; los mensajes llegan
+            # al bucle principal como eventos de PyGame
+            self.connection = SelectorConnection(self.post_message, self.post_closed)
+            if self.analysis:
+                self.connection.add_reader(self.analysis.conn, self.post_analysis)
+            self.connection.connect(self.host, self.port, timeout=10)
+            # Sin game_id el servidor nos sienta en su sala por defecto
+            self.connection.send({'type': 'join'})
 
             self.connected = True
             self.connection_status = "Conectado al servidor"
             print("✅ ¡Conectado al servidor!")
 
-            # Iniciar hilo para recibir mensajes
-            receive_thread = threading.Thread(target=self.receive_messages)
-            receive_thread.daemon = True
-            receive_thread.start()
-
             return True
 
         except Exception as e:
@@ -92,32 +179,65 @@ class GameClient:
             print(f"❌ {self.last_error}")
             return False
 
-    def receive_messages(self):
-        buffer = ""
-        while self.connected:
-            try:
-                data = self.socket.recv(4096).decode('utf-8')
-                if not data:
-                    print("📭 Servidor cerró la conexión")
-                    self.connected = False
-                    break
+    def post_message(self, message):
+        """Llamado desde el hilo de red: solo encola, el estado se cambia en el bucle principal."""
+        pygame.event.post(pygame.event.Event(NET_MESSAGE, message=message))
 
-                buffer += data
-                while '\n' in buffer:
-                    message_str, buffer = buffer.split('\n', 1)
-                    if message_str.strip():
-                        try:
-                            message = json.loads(message_str)
-                            self.handle_message(message)
-                        except json.JSONDecodeError as e:
-                            print(f"❌ Error decodificando JSON: {e}")
-
-            except socket.timeout:
-                continue
-            except Exception as e:
-                print(f"❌ Error recibiendo mensajes: {e}")
-                self.connected = False
-                break
+    def post_closed(self, closed_by_peer):
+        pygame.event.post(pygame.event.Event(NET_CLOSED, closed_by_peer=closed_by_peer))
+
+    def post_analysis(self, conn):
+        """Llamado desde el hilo de red cuando el proceso de análisis tiene un resultado."""
+        try:
+            result = conn.recv()
+        except (EOFError, OSError):
+            self.connection.remove_reader(conn)
+            return
+        pygame.event.post(pygame.event.Event(ANALYSIS_EVENT, result=result))
+
+    def start_analysis(self):
+        self.analysis = AnalysisWorker()
+        self.analysis.start()
+        if self.connection and self.connection.connected:
+            self.connection.add_reader(self.analysis.conn, self.post_analysis)
+        self.request_analysis()
+        print("🔬 Análisis activado")
+
+    def stop_analysis(self):
+        if self.connection:
+            self.connection.remove_reader(self.analysis.conn)
+        self.analysis.stop()
+        self.analysis = None
+        self.analysis_scores = {}
+        print("🔬 Análisis desactivado")
+
+    def request_analysis(self):
+        """Relanza el análisis tras cada cambio de game_state (solo busca en tu turno)."""
+        self.analysis_scores = {}
+        self.analysis_depth = 0
+        if not self.analysis:
+            return
+        game_state = self.game_state
+        if (game_state and not game_state['game_over'] and
+                game_state['current_player'] == self.player_color):
+            self.analysis.analyze(game_state['board'], self.player_color)
+        else:
+            self.analysis.idle()
+
+    def handle_analysis_event(self, event):
+        _, request_id, depth, scores = event.result
+        if not self.analysis or request_id != self.analysis.request_id:
+            return  # Resultado de una posición anterior
+        self.analysis_depth = depth
+        self.analysis_scores = {(row, col): score for row, col, score in scores}
+
+    def handle_network_event(self, event):
+        if event.type == NET_MESSAGE:
+            self.handle_message(event.message)
+        elif event.type == NET_CLOSED:
+            self.connected = False
+            self.connection_status = "Desconectado"
+            self.rollback_move()  # La jugada pendiente ya no llegará al servidor
 
     def handle_message(self, message):
         msg_type = message.get('type')
@@ -134,15 +254,20 @@ class GameClient:
             print("⏳ " + message['message'])
 
         elif msg_type == 'game_start':
-            self.game_state = message['game_state']
-            self.waiting_for_opponent = False
+            self.pending_move = None
+            self.apply_server_state(message['game_state'])
             print("🎮 ¡Juego iniciado!")
             print(f"📊 Tablero recibido - Turno actual: {self.game_state['current_player']}")
             print(f"🎯 Movimientos válidos: {self.game_state['valid_moves']}")
 
         elif msg_type == 'game_update':
-            self.game_state = message['game_state']
-            self.waiting_for_opponent = False
+            game_state = message['game_state']
+            if self.pending_move:
+                row, col, predicted = self.pending_move
+                self.pending_move = None
+                if state_hash(game_state) != predicted:
+                    print(f"↩️ El estado del servidor no coincide con la jugada ({row}, {col}) predicha")
+            self.apply_server_state(game_state)
             print("🔄 Juego actualizado")
             print(f"🎯 Movimientos válidos: {len(self.game_state['valid_moves'])} movimientos")
 
@@ -150,163 +275,294 @@ class GameClient:
             print(f"📢 Respuesta de movimiento: {message['message']}")
             if not message['success']:
                 print(f"❌ Movimiento fallido: {message['message']}")
+                self.rollback_move()
 
         elif msg_type == 'opponent_disconnected':
             self.waiting_for_opponent = True
             self.connection_status = "Oponente desconectado"
             print("⚠️ " + message['message'])
+            self.rollback_move()
+
+        elif msg_type == 'error':
+            print(f"❌ Error del servidor: {message['message']}")
+            self.rollback_move()
+
+    def apply_server_state(self, game_state):
+        """Adopta el estado del servidor, que siempre manda sobre la predicción local."""
+        self.game_state = game_state
+        self.waiting_for_opponent = False
+        self.update_board_size()
+        self.update_clocks()
+        self.confirmed_state = (game_state, self.clocks_received_at)
+        self.request_analysis()
+
+    def predict_move(self, row, col):
+        """Estado tras nuestra jugada según las reglas locales, antes de que conteste el servidor."""
+        state = self.game_state
+        geometry = bitboard.geometry(self.board_size)
+        black, white = geometry.from_board(state['board'])
+        own, opp = (black, white) if self.player_color == 1 else (white, black)
+        own, opp = geometry.play(own, opp, geometry.to_index(row, col))
+        black, white = (own, opp) if self.player_color == 1 else (opp, own)
+
+        # Turno siguiente: el rival, o repetimos si él tiene que pasar
+        current_player, moves = 3 - self.player_color, geometry.legal_moves(opp, own)
+        if not moves:
+            current_player, moves = self.player_color, geometry.legal_moves(own, opp)
+        predicted = dict(state, board=geometry.to_board(black, white), current_player=current_player,
+                         valid_moves=geometry.move_list(moves),
+                         scores={'black': black.bit_count(), 'white': white.bit_count()})
+        if not moves:
+            predicted.update(game_over=True, end_reason='board',
+                             winner=0 if black.bit_count() == white.bit_count()
+                             else 1 if black.bit_count() > white.bit_count() else 2)
+
+        clocks = state.get('clocks')
+        if clocks:
+            # Nuestro reloj se para con lo gastado más el incremento
+            key = 'black' if self.player_color == 1 else 'white'
+            elapsed = time.monotonic() - self.clocks_received_at
+            predicted['clocks'] = dict(clocks, **{key: max(clocks[key] - elapsed, 0.0) + clocks['increment']})
+        return predicted
+
+    def apply_local_move(self, row, col):
+        """Muestra la jugada en el acto y la envía; se deshace si el servidor la rechaza."""
+        predicted = self.predict_move(row, col)
+        self.pending_move = (row, col, state_hash(predicted))
+        self.game_state = predicted
+        self.update_clocks()
+        self.request_analysis()
+        if not self.send_move(row, col):
+            self.rollback_move()
+
+    def rollback_move(self):
+        """Vuelve al último estado confirmado por el servidor."""
+        if not self.pending_move:
+            return
+        row, col, _ = self.pending_move
+        print(f"↩️ Deshaciendo la jugada ({row}, {col})")
+        self.pending_move = None
+        self.game_state, received_at = self.confirmed_state
+        self.update_clocks(received_at)  # Los relojes siguen contando desde que llegaron
+        self.request_analysis()
 
     def send_message(self, message):
         if not self.connected:
             print("❌ No conectado, no se puede enviar mensaje")
             return False
 
-        try:
-            message_str = json.dumps(message) + '\n'
-            self.socket.send(message_str.encode('utf-8'))
-            print(f"📤 Mensaje enviado: {message['type']}")
-            return True
-        except Exception as e:
-            print(f"❌ Error enviando mensaje: {e}")
+        if not self.connection.send(message):
+            print("❌ Error enviando mensaje: conexión cerrada")
             self.connected = False
             return False
+        print(f"📤 Mensaje enviado: {message['type']}")
+        return True
 
     def send_move(self, row, col):
         message = {'type': 'move', 'row': row, 'col': col}
         return self.send_message(message)
 
-    def draw_waiting_screen(self):
-        self.screen.fill(BACKGROUND)
-
-        # Dibujar tablero base
-        for i in range(BOARD_SIZE + 1):
-            pygame.draw.line(self.screen, BLACK, (0, i * CELL_SIZE), (WIDTH, i * CELL_SIZE), 2)
-            pygame.draw.line(self.screen, BLACK, (i * CELL_SIZE, 0), (i * CELL_SIZE, HEIGHT), 2)
-
-        # Dibujar fichas por defecto
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
+    def build_render_cache(self):
+        """Pre-renderiza el tablero estático y los sprites de fichas y resaltado."""
+        # Fondo verde con la cuadrícula: se dibuja una sola vez
+        self.board_layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.board_layer.fill(BACKGROUND)
+        for i in range(self.board_size + 1):
+            pygame.draw.line(self.board_layer, BLACK, (0, i * self.cell_size), (WIDTH, i * self.cell_size), 2)
+            pygame.draw.line(self.board_layer, BLACK, (i * self.cell_size, 0), (i * self.cell_size, HEIGHT), 2)
+
+        center = (self.cell_size // 2, self.cell_size // 2)
+        self.cell_sprites = {}
+        for player, color in ((1, BLACK), (2, WHITE)):
+            sprite = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, color, center, self.dot_radius)
+            pygame.draw.circle(sprite, DISC_BORDER, center, self.dot_radius, 2)
+            self.cell_sprites[player] = sprite.convert_alpha()
+
+        # Círculo de highlight con un punto rojo en el centro para mejor visibilidad
+        sprite = pygame.Surface((self.cell_size, self.cell_size), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, HIGHLIGHT, center, self.highlight_radius)
+        pygame.draw.circle(sprite, RED, center, 3)
+        self.cell_sprites[MOVE_CELL] = sprite.convert_alpha()
+
+        # Fichas sin borde para la pantalla de espera
+        self.waiting_layer = self.board_layer.copy()
+        for row in range(self.board_size):
+            for col in range(self.board_size):
                 if self.default_board[row][col] != 0:
-                    center_x = col * CELL_SIZE + CELL_SIZE // 2
-                    center_y = row * CELL_SIZE + CELL_SIZE // 2
+                    center_x = col * self.cell_size + self.cell_size // 2
+                    center_y = row * self.cell_size + self.cell_size // 2
                     color = BLACK if self.default_board[row][col] == 1 else WHITE
-                    pygame.draw.circle(self.screen, color, (center_x, center_y), DOT_RADIUS)
-
-        # Overlay de espera
+                    pygame.draw.circle(self.waiting_layer, color, (center_x, center_y), self.dot_radius)
         overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
         overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        self.waiting_layer.blit(overlay, (0, 0))
+
+        self.info_bg = pygame.Surface((WIDTH, INFO_HEIGHT)).convert()
+        self.info_bg.set_alpha(200)
+        self.info_bg.fill(BLACK)
+
+    def invalidate_render(self):
+        """Fuerza un redibujado completo en el siguiente frame."""
+        self.rendered_cells = None
+        self.waiting_key = None
+
+    def draw_waiting_screen(self):
+        """Dibuja la pantalla de espera solo si cambió su contenido."""
+        waiting_key = (self.connection_status, self.connected, self.player_color, self.waiting_for_opponent)
+        if waiting_key == self.waiting_key:
+            return []
+        self.waiting_key = waiting_key
+        self.rendered_cells = None
+
+        # Tablero base, fichas por defecto y overlay ya pre-renderizados
+        self.screen.blit(self.waiting_layer, (0, 0))
 
         # Textos
-        title = self.big_font.render("Sistemas Inteligentes", True, WHITE)
+        title = self.text_cache.render(self.big_font, "Sistemas Inteligentes", WHITE)
         self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 100))
 
         status_color = GREEN if self.connected else RED
-        status = self.font.render(self.connection_status, True, status_color)
+        status = self.text_cache.render(self.font, self.connection_status, status_color)
         self.screen.blit(status, (WIDTH // 2 - status.get_width() // 2, 180))
 
         if self.player_color:
             player_text = f"Eres: {'NEGRO' if self.player_color == 1 else 'BLANCO'}"
-            player_surface = self.font.render(player_text, True, YELLOW)
+            player_surface = self.text_cache.render(self.font, player_text, YELLOW)
             self.screen.blit(player_surface, (WIDTH // 2 - player_surface.get_width() // 2, 220))
 
         if self.waiting_for_opponent:
-            wait_text = self.big_font.render("ESPERANDO OPONENTE...", True, YELLOW)
+            wait_text = self.text_cache.render(self.big_font, "ESPERANDO OPONENTE...", YELLOW)
             self.screen.blit(wait_text, (WIDTH // 2 - wait_text.get_width() // 2, 300))
         else:
-            ready_text = self.big_font.render("¡LISTO PARA JUGAR!", True, GREEN)
+            ready_text = self.text_cache.render(self.big_font, "¡LISTO PARA JUGAR!", GREEN)
             self.screen.blit(ready_text, (WIDTH // 2 - ready_text.get_width() // 2, 300))
 
         # Instrucciones
         instructions = [
             "Presiona R para reconectar" if not self.connected else "",
+            "Presiona A para activar/desactivar el análisis",
             "Presiona ESC para salir"
         ]
         y_pos = 400
         for line in instructions:
             if line:
-                text = self.small_font.render(line, True, WHITE)
+                text = self.text_cache.render(self.small_font, line, WHITE)
                 self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y_pos))
                 y_pos += 30
 
-    def draw_board(self):
-        if not self.game_state:
-            return
+        return [self.screen.get_rect()]
 
-        self.screen.fill(BACKGROUND)
-
-        # Dibujar tablero
-        for i in range(BOARD_SIZE + 1):
-            pygame.draw.line(self.screen, BLACK, (0, i * CELL_SIZE), (WIDTH, i * CELL_SIZE), 2)
-            pygame.draw.line(self.screen, BLACK, (i * CELL_SIZE, 0), (i * CELL_SIZE, HEIGHT), 2)
-
-        # Dibujar fichas
-        board = self.game_state['board']
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if board[row][col] != 0:
-                    center_x = col * CELL_SIZE + CELL_SIZE // 2
-                    center_y = row * CELL_SIZE + CELL_SIZE // 2
-                    color = BLACK if board[row][col] == 1 else WHITE
-                    pygame.draw.circle(self.screen, color, (center_x, center_y), DOT_RADIUS)
-                    pygame.draw.circle(self.screen, (100, 100, 100), (center_x, center_y), DOT_RADIUS, 2)
+    def compute_cells(self, game_state):
+        """Estado visible de cada casilla: vacía, ficha negra/blanca o movimiento resaltado."""
+        board = game_state['board']
+        cells = {}
+        for row in range(self.board_size):
+            for col in range(self.board_size):
+                cells[(row, col)] = board[row][col]
 
         # Resaltar movimientos válidos (solo si es tu turno)
-        if (not self.game_state['game_over'] and
-                self.game_state['current_player'] == self.player_color and
-                'valid_moves' in self.game_state):
-
-            valid_moves = self.game_state['valid_moves']
-            print(f"🎯 Dibujando {len(valid_moves)} movimientos válidos")
-
-            for move in valid_moves:
+        if (not game_state['game_over'] and
+                game_state['current_player'] == self.player_color and
+                'valid_moves' in game_state):
+            scores = self.analysis_scores
+            best_score = max(scores.values()) if scores else None
+            for move in game_state['valid_moves']:
                 # Asegurarse de que el movimiento tenga el formato correcto
-                if isinstance(move, list) and len(move) == 2:
-                    row, col = move
-                elif isinstance(move, tuple) and len(move) == 2:
-                    row, col = move
-                else:
-                    continue
-
-                center_x = col * CELL_SIZE + CELL_SIZE // 2
-                center_y = row * CELL_SIZE + CELL_SIZE // 2
+                if isinstance(move, (list, tuple)) and len(move) == 2:
+                    score = scores.get((move[0], move[1]))
+                    if score is None:
+                        cells[(move[0], move[1])] = MOVE_CELL
+                    else:
+                        # La puntuación forma parte del estado: la casilla se redibuja al cambiar
+                        cells[(move[0], move[1])] = (MOVE_CELL, f"{score:+.1f}", score == best_score)
+        return cells
+
+    def cell_rect(self, row, col):
+        return pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+
+    def draw_cell(self, row, col, state):
+        """Restaura el fondo de la casilla desde la capa estática y pinta su sprite."""
+        rect = self.cell_rect(row, col)
+        self.screen.blit(self.board_layer, rect, rect)
+        self.draw_cell_content(rect, state)
+
+    def draw_cell_content(self, rect, state):
+        if isinstance(state, tuple):
+            # Movimiento resaltado con su puntuación del análisis
+            _, score_text, is_best = state
+            self.screen.blit(self.cell_sprites[MOVE_CELL], rect)
+            text = self.text_cache.render(self.small_font, score_text, BLUE if is_best else BLACK)
+            self.screen.blit(text, (rect.centerx - text.get_width() // 2, rect.bottom - text.get_height() - 4))
+        elif state != EMPTY_CELL:
+            self.screen.blit(self.cell_sprites[state], rect)
 
-                # Dibujar círculo de highlight
-                highlight_surface = pygame.Surface((HIGHLIGHT_RADIUS * 2, HIGHLIGHT_RADIUS * 2), pygame.SRCALPHA)
-                pygame.draw.circle(highlight_surface, HIGHLIGHT, (HIGHLIGHT_RADIUS, HIGHLIGHT_RADIUS), HIGHLIGHT_RADIUS)
-                self.screen.blit(highlight_surface, (center_x - HIGHLIGHT_RADIUS, center_y - HIGHLIGHT_RADIUS))
-
-                # Dibujar punto pequeño en el centro para mejor visibilidad
-                pygame.draw.circle(self.screen, (255, 0, 0), (center_x, center_y), 3)
-
-        # Información del juego
+    def draw_board(self):
+        """Redibuja solo las casillas que cambiaron y devuelve los rectángulos sucios."""
+        game_state = self.game_state
+        if not game_state:
+            return []
+
+        cells = self.compute_cells(game_state)
+        previous = self.rendered_cells
+        self.rendered_cells = cells
+        self.waiting_key = None
+        info = self.clock_texts()
+        info_changed = info != self.rendered_info
+        self.rendered_info = info
+
+        if previous is None:
+            # Primer frame: tablero completo
+            self.screen.blit(self.board_layer, (0, 0))
+            for (row, col), state in cells.items():
+                self.draw_cell_content(self.cell_rect(row, col), state)
+            self.draw_game_info()
+            return [self.screen.get_rect()]
+
+        dirty = [pos for pos, state in cells.items() if previous.get(pos) != state]
+        if not dirty and not info_changed:
+            return []
+
+        highlighted = sum(1 for state in cells.values() if state == MOVE_CELL or isinstance(state, tuple))
+        if highlighted:
+            print(f"🎯 Dibujando {highlighted} movimientos válidos")
+
+        rects = []
+        for row, col in dirty:
+            self.draw_cell(row, col, cells[(row, col)])
+            rects.append(self.cell_rect(row, col))
+
+        # La barra de información se superpone a las primeras filas: se recomponen enteras
+        for row in range(self.info_rows):
+            for col in range(self.board_size):
+                self.draw_cell(row, col, cells[(row, col)])
         self.draw_game_info()
+        rects.append(self.info_rect)
+        return rects
 
     def draw_game_info(self):
-        font = pygame.font.SysFont('Arial', 28, bold=True)
-        if not self.game_state:
+        game_state = self.game_state
+        if not game_state:
             return
 
         # Barra de información
-        info_bg = pygame.Surface((WIDTH, 60))
-        info_bg.set_alpha(200)
-        info_bg.fill(BLACK)
-        self.screen.blit(info_bg, (0, 0))
+        self.screen.blit(self.info_bg, (0, 0))
 
         # Logo a la derecha
         self.screen.blit(self.logo, (WIDTH - 100, 10))
         # Turno actual
         logo_text = "Hello class, I wanna play a game!"
-        if self.game_state['game_over']:
-            turn_text = "JUEGO TERMINADO"
+        if game_state['game_over']:
+            turn_text = "TIEMPO AGOTADO" if game_state.get('end_reason') == 'time' else "JUEGO TERMINADO"
             color = RED
         else:
-            is_my_turn = self.game_state['current_player'] == self.player_color
+            is_my_turn = game_state['current_player'] == self.player_color
             turn_text = "TU TURNO" if is_my_turn else "TURNO OPONENTE"
             color = GREEN if is_my_turn else BLUE
 
-        turn_surface = self.font.render(turn_text, True, color)
-        logo_surface = font.render(logo_text, True, RED)
+        # Las superficies solo se vuelven a renderizar cuando cambia el texto
+        turn_surface = self.text_cache.render(self.font, turn_text, color)
+        logo_surface = self.text_cache.render(self.title_font, logo_text, RED)
 
         #self.screen.blit(turn_surface, (WIDTH // 2 - turn_surface.get_width() // 2, 20))
         self.screen.blit(turn_surface, (20, 50))
@@ -314,16 +570,22 @@ class GameClient:
 
 
         # Puntuación
-        scores = self.game_state['scores']
+        scores = game_state['scores']
         score_text = f"Negro: {scores['black']}  Blanco: {scores['white']}"
-        score_surface = self.small_font.render(score_text, True, WHITE)
+        score_surface = self.text_cache.render(self.small_font, score_text, WHITE)
         self.screen.blit(score_surface, (WIDTH - 200, 25))
 
+        # Relojes
+        clocks = self.clock_texts()
+        if clocks:
+            clock_surface = self.text_cache.render(self.small_font, f"⏱ {clocks[0]}  /  {clocks[1]}", YELLOW)
+            self.screen.blit(clock_surface, (WIDTH - 200, 4))
+
         # Información de movimientos válidos
-        if not self.game_state['game_over'] and self.game_state['current_player'] == self.player_color:
-            valid_count = len(self.game_state['valid_moves']) if 'valid_moves' in self.game_state else 0
+        if not game_state['game_over'] and game_state['current_player'] == self.player_color:
+            valid_count = len(game_state['valid_moves']) if 'valid_moves' in game_state else 0
             moves_text = f"Movimientos válidos: {valid_count}"
-            moves_surface = self.small_font.render(moves_text, True, YELLOW)
+            moves_surface = self.text_cache.render(self.small_font, moves_text, YELLOW)
             self.screen.blit(moves_surface, (10, 25))
 
     def handle_click(self, pos):
@@ -339,12 +601,17 @@ class GameClient:
             print("❌ No es tu turno")
             return
 
-        col = pos[0] // CELL_SIZE
-        row = pos[1] // CELL_SIZE
+        if self.pending_move:
+            # El rival pasa según la predicción: se espera a que el servidor confirme
+            print("⏳ Esperando la confirmación de la jugada anterior")
+            return
+
+        col = pos[0] // self.cell_size
+        row = pos[1] // self.cell_size
 
         print(f"🎯 Click en posición: ({row}, {col})")
 
-        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+        if 0 <= row < self.board_size and 0 <= col < self.board_size:
             # Verificar si el movimiento es válido
             valid_moves = self.game_state.get('valid_moves', [])
             print(f"🎯 Movimientos válidos disponibles: {valid_moves}")
@@ -370,7 +637,7 @@ class GameClient:
 
             if is_valid:
                 print(f"✅ Movimiento válido en ({row}, {col}), enviando al servidor...")
-                self.send_move(row, col)
+                self.apply_local_move(row, col)
             else:
                 print(f"❌ Movimiento inválido en ({row}, {col})")
                 print(f"   Movimiento clickeado: {clicked_move}")
@@ -384,39 +651,74 @@ class GameClient:
 
         running = True
         while running:
-            for event in pygame.event.get():
+            # Bloquea hasta que haya entrada o un mensaje de red
+            for event in self.scheduler.wait_events():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:
                         self.handle_click(event.pos)
+                        self.scheduler.request_frame()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         running = False
+                    elif event.key == pygame.K_a:
+                        if self.analysis:
+                            self.stop_analysis()
+                        else:
+                            self.start_analysis()
+                        self.scheduler.request_frame()
                     elif event.key == pygame.K_r and not self.connected:
                         print("🔄 Intentando reconectar...")
                         self.connect()
+                        self.scheduler.request_frame()
+                elif event.type == CLOCK_TICK:
+                    self.scheduler.request_frame()  # draw_board solo repinta si cambió el texto
+                elif event.type == ANALYSIS_EVENT:
+                    self.handle_analysis_event(event)
+                    self.scheduler.request_frame()
+                elif event.type in (NET_MESSAGE, NET_CLOSED):
+                    # Los cambios de estado se aplican aquí, entre frames
+                    self.handle_network_event(event)
+                    self.scheduler.request_frame()
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.invalidate_render()
+                    self.scheduler.request_frame()
+
+            if not running or not self.scheduler.should_render():
+                continue
 
-            # Dibujar
+            # Dibujar solo lo que cambió
             if self.connected and self.game_state and not self.waiting_for_opponent:
-                self.draw_board()
+                dirty_rects = self.draw_board()
             else:
-                self.draw_waiting_screen()
+                dirty_rects = self.draw_waiting_screen()
 
-            pygame.display.flip()
-            self.clock.tick(60)
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            self.scheduler.frame_done()
 
-        if self.socket:
-            self.socket.close()
+        if self.analysis:
+            self.stop_analysis()
+        if self.connection:
+            self.connection.close()
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
     print("=== 🎮 CLIENTE  ===")
-    host = input("Servidor [localhost]: ").strip() or 'localhost'
-    port_input = input("Puerto [5555]: ").strip()
-    port = int(port_input) if port_input.isdigit() else 5555
-
-    client = GameClient(host, port)
+    headless = headless_requested()
+    if headless:
+        # Sin prompts: python cliente.py --headless [host] [puerto]
+        args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+        host = args[0] if args else 'localhost'
+        port = int(args[1]) if len(args) > 1 and args[1].isdigit() else 5555
+    else:
+        host = input("Servidor [localhost]: ").strip() or 'localhost'
+        port_input = input("Puerto [5555]: ").strip()
+        port = int(port_input) if port_input.isdigit() else 5555
+
+    # --analysis: puntuación de cada movimiento (también con la tecla A)
+    client = GameClient(host, port, headless=headless, analysis='--analysis' in sys.argv)
     client.run()
\ No newline at end of file
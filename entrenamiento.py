@@ -0,0 +1,336 @@
+# entrenamiento.py
+# Ajuste de los pesos de evaluación de OthelloAI a partir de partidas de autojuego
+#
+# Uso:
+#   python entrenamiento.py generar --games 2000 --out posiciones.npz
+#   python entrenamiento.py ajustar --data posiciones.npz --method logistic --out pesos_ia.json
+#   python entrenamiento.py ajustar --data posiciones.npz --model patrones --out patrones.npz
+#   python entrenamiento.py probcut --data posiciones.npz --pairs 5:1,6:2,7:3 --out probcut.json
+#
+# Las posiciones se guardan como bitboards uint64 (negras, blancas) junto con
+# el jugador al turno y el resultado final de la partida (fichas negras menos
+# blancas). El ajuste reproduce exactamente la forma de OthelloAI._evaluate
+# (matriz de pesos simétrica + movilidad + fichas + estabilidad), así que evaluar un nodo
+# cuesta lo mismo que antes. Con --model patrones se ajustan en su lugar las
+# tablas de patrones.py (evaluation=patterns en OthelloAI).
+#
+# `probcut` calibra la búsqueda selectiva (selective=1 en OthelloAI): para cada
+# par de profundidades (profunda:corta) busca las mismas posiciones a ambas
+# profundidades y ajusta profunda ≈ a * corta + b, con el error típico sigma.
+# La calibración guarda la huella de la evaluación usada (--engine) y un motor
+# con otra evaluación o con otros pesos no la carga.
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+
+import bitboard
+import patrones
+import reglas
+import torneo
+from ia_cliente import WIN_SCORE
+
+
+def _symmetry_classes(board_size=8):
+    """Asigna a cada casilla su clase bajo las 8 simetrías del tablero (10 clases en 8x8)."""
+    classes = np.zeros((board_size, board_size), dtype=int)
+    last = board_size - 1
+    keys = {}
+    for row in range(board_size):
+        for col in range(board_size):
+            r, c = min(row, last - row), min(col, last - col)
+            key = (min(r, c), max(r, c))
+            classes[row, col] = keys.setdefault(key, len(keys))
+    return classes
+
+
+SQUARE_CLASSES = _symmetry_classes()
+NUM_CLASSES = int(SQUARE_CLASSES.max()) + 1
+
+
+# --- Generación de posiciones ---
+
+def self_play_game(task):
+    """Juega una partida de autojuego y devuelve sus posiciones y el resultado final."""
+    opening, depth, epsilon, seed, weights_file = task
+    rng = random.Random(seed)
+    engine = torneo.get_engine({'depth': depth, 'weights_file': weights_file})
+
+    board = reglas.initial_board()
+    player = 1
+    game_over = False
+    boards, players = [], []
+    for move in opening:
+        new_boards, next_players, over = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+        board, player, game_over = new_boards[0], int(next_players[0]), bool(over[0])
+
+    while not game_over:
+        boards.append(board)
+        players.append(player)
+        legal = reglas.legal_move_list(board, player)
+        if rng.random() < epsilon:
+            move = rng.choice(legal)  # Exploración para diversificar las posiciones
+        else:
+            engine.set_player_color(player)
+            move = engine.get_best_move(board.tolist())
+            if move not in legal:
+                move = legal[0]
+        new_boards, next_players, over = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+        board, player, game_over = new_boards[0], int(next_players[0]), bool(over[0])
+
+    black, white = reglas.disc_counts_batch(board[np.newaxis])[0]
+    return np.array(boards), np.array(players, dtype=np.uint8), int(black) - int(white)
+
+
+def generate_positions(games, depth=1, epsilon=0.1, workers=None, seed=0, weights_file=''):
+    """Genera posiciones de autojuego etiquetadas con el resultado final."""
+    openings = torneo.random_openings(games, seed=seed)
+    tasks = [(opening, depth, epsilon, seed * 1_000_003 + i, weights_file)
+             for i, opening in enumerate(openings)]
+
+    workers = workers or os.cpu_count()
+    with Pool(workers) as pool:
+        results = pool.map(self_play_game, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+
+    black, white, player, outcome, game = [], [], [], [], []
+    for index, (boards, players, result) in enumerate(results):
+        if len(boards) == 0:
+            continue
+        b, w = reglas.boards_to_bitboards(boards)
+        black.append(b)
+        white.append(w)
+        player.append(players)
+        outcome.append(np.full(len(boards), result, dtype=np.int8))
+        game.append(np.full(len(boards), index, dtype=np.uint32))
+
+    return {
+        'black': np.concatenate(black),
+        'white': np.concatenate(white),
+        'player': np.concatenate(player),
+        'outcome': np.concatenate(outcome),
+        'game': np.concatenate(game),
+    }
+
+
+# --- Ajuste ---
+
+def extract_features(boards):
+    """Características de `OthelloAI._evaluate` desde el punto de vista de las negras.
+
+    Columnas: diferencia de fichas por clase de simetría (NUM_CLASSES),
+    movilidad normalizada, diferencia total de fichas y diferencia de fichas
+    estables.
+    """
+    boards = np.asarray(boards)
+    n = len(boards)
+    diff = (boards == 1).astype(np.int16) - (boards == 2).astype(np.int16)
+
+    features = np.zeros((n, NUM_CLASSES + 3))
+    flat_diff = diff.reshape(n, -1)
+    flat_classes = SQUARE_CLASSES.reshape(-1)
+    for k in range(NUM_CLASSES):
+        features[:, k] = flat_diff[:, flat_classes == k].sum(axis=1)
+
+    black_moves = reglas.legal_moves_batch(boards, 1).reshape(n, -1).sum(axis=1)
+    white_moves = reglas.legal_moves_batch(boards, 2).reshape(n, -1).sum(axis=1)
+    total = black_moves + white_moves
+    features[:, NUM_CLASSES] = np.where(total > 0, (black_moves - white_moves) / np.maximum(total, 1), 0)
+    features[:, NUM_CLASSES + 1] = flat_diff.sum(axis=1)
+    black, white = reglas.boards_to_bitboards(boards)
+    for i, (b, w) in enumerate(zip(black.tolist(), white.tolist())):
+        features[i, NUM_CLASSES + 2] = bitboard.stable(b, w).bit_count() - bitboard.stable(w, b).bit_count()
+    return features
+
+
+def fit_least_squares(features, outcome, ridge=1.0):
+    """Regresión ridge del resultado final (diferencia de fichas)."""
+    gram = features.T @ features + ridge * np.eye(features.shape[1])
+    return np.linalg.solve(gram, features.T @ outcome)
+
+
+def fit_logistic(features, outcome, ridge=1.0, iterations=25):
+    """Regresión logística (Newton/IRLS) de la probabilidad de victoria; empate = 0.5."""
+    target = np.where(outcome > 0, 1.0, np.where(outcome < 0, 0.0, 0.5))
+    weights = np.zeros(features.shape[1])
+    for _ in range(iterations):
+        prob = 1 / (1 + np.exp(-(features @ weights)))
+        gradient = features.T @ (prob - target) + ridge * weights
+        hessian = (features * (prob * (1 - prob))[:, np.newaxis]).T @ features + ridge * np.eye(len(weights))
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    return weights
+
+
+def weights_to_json(weights):
+    """Convierte los coeficientes ajustados al formato que carga OthelloAI.load_weights."""
+    class_weights = weights[:NUM_CLASSES]
+    return {
+        'weight_matrix': class_weights[SQUARE_CLASSES].round(6).tolist(),
+        'position_weight': 1.0,
+        'mobility_weight': float(weights[NUM_CLASSES]),
+        'disc_weight': float(weights[NUM_CLASSES + 1]),
+        'stability_weight': float(weights[NUM_CLASSES + 2]),
+    }
+
+
+def fit_weights(data, method='logistic', ridge=1.0):
+    boards = reglas.bitboards_to_boards(data['black'], data['white'])
+    features = extract_features(boards)
+    outcome = data['outcome'].astype(float)
+    if method == 'logistic':
+        weights = fit_logistic(features, outcome, ridge)
+    else:
+        weights = fit_least_squares(features, outcome, ridge)
+    return weights_to_json(weights)
+
+
+def fit_patterns(data, ridge=1.0, iterations=30):
+    """Ajusta las tablas de patrones (una por fase) al resultado final por mínimos cuadrados.
+
+    Cada posición se usa también con los colores intercambiados y el resultado
+    cambiado de signo. El ajuste es un descenso por coordenadas en bloque: cada
+    iteración reparte el residuo entre las entradas de tabla que lo producen,
+    normalizado por cuántas veces aparece cada entrada (np.bincount).
+    """
+    boards = reglas.bitboards_to_boards(data['black'], data['white'])
+    swapped = np.where(boards == 0, 0, 3 - boards)
+    outcome = data['outcome'].astype(float)
+    features, stages = patrones.board_features(np.concatenate([boards, swapped]))
+    outcome = np.concatenate([outcome, -outcome])
+
+    tables = np.zeros((patrones.STAGES, patrones.TABLE_SIZE))
+    for stage in range(patrones.STAGES):
+        selected = stages == stage
+        if not selected.any():
+            continue
+        stage_features, target = features[selected], outcome[selected]
+        flat = stage_features.ravel()
+        counts = np.bincount(flat, minlength=patrones.TABLE_SIZE)
+        weights = tables[stage]
+        for _ in range(iterations):
+            residual = target - weights[stage_features].sum(axis=1)
+            gradient = np.bincount(flat, weights=np.repeat(residual, patrones.NUM_INSTANCES),
+                                   minlength=patrones.TABLE_SIZE)
+            weights += gradient / (counts * patrones.NUM_INSTANCES + ridge)
+        error = np.sqrt(np.mean((target - weights[stage_features].sum(axis=1)) ** 2))
+        print(f"   Fase {stage}: {int(selected.sum())} posiciones, error {error:.2f} fichas")
+    return tables
+
+
+def probcut_task(task):
+    """Puntuaciones de una posición a cada profundidad, desde el bando al turno."""
+    config, board, player, depths = task
+    engine = torneo.get_engine(config)
+    engine.set_player_color(player)
+    scores = {}
+    for depth in depths:
+        engine.max_depth = depth
+        engine.get_best_move(board)
+        scores[depth] = engine.last_stats.score
+    return scores
+
+
+def calibrate_probcut(data, pairs, config, positions=200, workers=None, seed=0):
+    """Ajuste lineal de la búsqueda profunda sobre la corta para cada par (profunda, corta)."""
+    boards = reglas.bitboards_to_boards(data['black'], data['white'])
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(boards), size=min(positions, len(boards)), replace=False)
+    depths = sorted({depth for pair in pairs for depth in pair})
+    tasks = [(config, boards[i].tolist(), int(data['player'][i]), depths) for i in sample]
+
+    workers = workers or os.cpu_count()
+    with Pool(workers) as pool:
+        results = pool.map(probcut_task, tasks, chunksize=1)
+
+    calibration = []
+    for depth, shallow in pairs:
+        scores = np.array([(r[shallow], r[depth]) for r in results
+                           if r[shallow] is not None and r[depth] is not None]).reshape(-1, 2)
+        # Las posiciones ya resueltas (puntuación de final de partida) no sirven para el ajuste
+        scores = scores[np.all(np.abs(scores) < WIN_SCORE, axis=1)]
+        if len(scores) < 2:
+            print(f"⚠️ {depth}:{shallow}: solo {len(scores)} posiciones sin resolver, el par se omite")
+            continue
+        a, b = np.polyfit(scores[:, 0], scores[:, 1], 1)
+        sigma = float(np.std(scores[:, 1] - (a * scores[:, 0] + b)))
+        calibration.append({'depth': depth, 'shallow': shallow, 'a': float(a), 'b': float(b),
+                            'sigma': sigma, 'samples': len(scores)})
+        print(f"   {depth}:{shallow}  a={a:.3f} b={b:.2f} sigma={sigma:.2f} ({len(scores)} posiciones)")
+    return calibration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrenamiento de los pesos de evaluación por autojuego")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate = subparsers.add_parser('generar', help="generar posiciones de autojuego")
+    generate.add_argument('--games', type=int, default=1000)
+    generate.add_argument('--depth', type=int, default=1)
+    generate.add_argument('--epsilon', type=float, default=0.1)
+    generate.add_argument('--workers', type=int, default=None)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--weights', default='', help="pesos usados por el motor durante el autojuego")
+    generate.add_argument('--out', default='posiciones.npz')
+
+    fit = subparsers.add_parser('ajustar', help="ajustar pesos a partir de posiciones")
+    fit.add_argument('--data', default='posiciones.npz')
+    fit.add_argument('--method', choices=['logistic', 'lstsq'], default='logistic')
+    fit.add_argument('--ridge', type=float, default=1.0)
+    fit.add_argument('--model', choices=['matriz', 'patrones'], default='matriz',
+                     help="matriz de pesos de OthelloAI o tablas de patrones")
+    fit.add_argument('--out', default=None, help="por defecto pesos_ia.json o patrones.npz")
+
+    probcut = subparsers.add_parser('probcut', help="calibrar la búsqueda selectiva (ProbCut)")
+    probcut.add_argument('--data', default='posiciones.npz')
+    probcut.add_argument('--pairs', default='5:1,6:2,7:3', help="pares profundidad:profundidad corta")
+    probcut.add_argument('--positions', type=int, default=200)
+    probcut.add_argument('--engine', default='', help="configuración del motor, p. ej. 'evaluation=patterns'")
+    probcut.add_argument('--workers', type=int, default=None)
+    probcut.add_argument('--seed', type=int, default=0)
+    probcut.add_argument('--out', default='probcut.json')
+
+    args = parser.parse_args()
+
+    if args.command == 'generar':
+        start_time = time.time()
+        data = generate_positions(args.games, args.depth, args.epsilon, args.workers, args.seed, args.weights)
+        np.savez_compressed(args.out, **data)
+        print(f"💾 {len(data['black'])} posiciones de {args.games} partidas guardadas en {args.out} "
+              f"({time.time() - start_time:.1f}s)")
+    elif args.command == 'probcut':
+        start_time = time.time()
+        pairs = [tuple(int(d) for d in pair.split(':')) for pair in args.pairs.split(',')]
+        config = torneo.parse_config(args.engine, 'probcut')
+        with np.load(args.data) as data:
+            pairs = calibrate_probcut(dict(data), pairs, config, args.positions, args.workers, args.seed)
+        # OthelloAI.load_probcut rechaza la calibración si su evaluación no es esta
+        engine = torneo.get_engine(config)
+        with open(args.out, 'w') as f:
+            json.dump({'board_size': 8, 'engine': args.engine, 'evaluation': engine.evaluation,
+                       'evaluation_salt': engine.evaluation_salt, 'pairs': pairs}, f, indent=2)
+        print(f"📦 Calibración de ProbCut guardada en {args.out} ({time.time() - start_time:.1f}s)")
+    elif args.model == 'patrones':
+        out = args.out or patrones.PATTERNS_FILE
+        with np.load(args.data) as data:
+            tables = fit_patterns(dict(data), args.ridge)
+        np.savez_compressed(out, tables=tables)
+        print(f"📦 Tablas de patrones guardadas en {out}")
+    else:
+        out = args.out or 'pesos_ia.json'
+        with np.load(args.data) as data:
+            weights = fit_weights(dict(data), args.method, args.ridge)
+        with open(out, 'w') as f:
+            json.dump(weights, f, indent=2)
+        print(f"📦 Pesos ({args.method}) guardados en {out}")
+
+
+if __name__ == "__main__":
+    main()
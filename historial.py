@@ -0,0 +1,119 @@
+# historial.py
+# Historial compacto de partidas con instantáneas cada K jugadas
+#
+# Una partida se guarda como una secuencia de bytes (casilla = fila * 8 +
+# columna); los pases no se guardan porque se deducen de las reglas. Para
+# moverse por la partida se guardan instantáneas del tablero (bitboards)
+# cada K jugadas, así cualquier posición se reconstruye desde la instantánea
+# más cercana reproduciendo como mucho K - 1 jugadas.
+import os
+
+import numpy as np
+
+import bitboard
+
+CHECKPOINT_INTERVAL = 8
+GAMES_FILE = 'partidas.npz'
+
+
+def _advance(black, white, player, index):
+    """Aplica una jugada y resuelve el turno siguiente (incluido el pase)."""
+    own, opp = (black, white) if player == 1 else (white, black)
+    own, opp = bitboard.play(own, opp, index)
+    black, white = (own, opp) if player == 1 else (opp, own)
+    opponent = 3 - player
+    opp_own, opp_opp = (black, white) if opponent == 1 else (white, black)
+    if bitboard.legal_moves(opp_own, opp_opp):
+        return black, white, opponent
+    return black, white, player
+
+
+class GameRecord:
+    """Jugadas de una partida más instantáneas (negras, blancas, jugador) cada K jugadas."""
+
+    def __init__(self, moves=b'', interval=CHECKPOINT_INTERVAL):
+        self.moves = bytearray(moves)
+        self.interval = interval
+        black, white = bitboard.from_board(_initial_board())
+        self.checkpoints = [(black, white, 1)]
+        self.last = (black, white, 1)
+        self._built = 0  # Jugadas ya procesadas para las instantáneas
+
+    def __len__(self):
+        return len(self.moves)
+
+    def append(self, row, col):
+        # Solo se guarda el byte; las instantáneas se completan al consultar
+        self.moves.append(bitboard.to_index(row, col))
+
+    def _build_checkpoints(self):
+        black, white, player = self.last
+        for ply in range(self._built, len(self.moves)):
+            black, white, player = _advance(black, white, player, self.moves[ply])
+            if (ply + 1) % self.interval == 0:
+                self.checkpoints.append((black, white, player))
+        self._built = len(self.moves)
+        self.last = (black, white, player)
+
+    def position_at(self, ply):
+        """Posición (negras, blancas, jugador al turno) tras `ply` jugadas, en O(K)."""
+        self._build_checkpoints()
+        ply = max(0, min(ply, len(self.moves)))
+        checkpoint = ply // self.interval
+        black, white, player = self.checkpoints[checkpoint]
+        for index in self.moves[checkpoint * self.interval:ply]:
+            black, white, player = _advance(black, white, player, index)
+        return black, white, player
+
+    def board_at(self, ply):
+        black, white, player = self.position_at(ply)
+        return np.array(bitboard.to_board(black, white)), player
+
+    def move_at(self, ply):
+        """Jugada número `ply` (empezando en 0) como (fila, columna)."""
+        return bitboard.to_move(self.moves[ply])
+
+
+def _initial_board():
+    board = [[0] * bitboard.SIZE for _ in range(bitboard.SIZE)]
+    mid = bitboard.SIZE // 2
+    board[mid - 1][mid - 1] = board[mid][mid] = 2
+    board[mid - 1][mid] = board[mid][mid - 1] = 1
+    return board
+
+
+class GameArchive:
+    """Colección de partidas cargadas de disco: todas las jugadas en un único array.
+
+    Las GameRecord (y sus instantáneas) se construyen solo al abrir cada
+    partida, así que cargar miles de partidas es inmediato.
+    """
+
+    def __init__(self, moves=None, offsets=None):
+        self.moves = np.zeros(0, dtype=np.uint8) if moves is None else moves
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+        self._records = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if index not in self._records:
+            start, end = self.offsets[index], self.offsets[index + 1]
+            self._records[index] = GameRecord(self.moves[start:end].tobytes())
+        return self._records[index]
+
+    def append(self, record):
+        self.moves = np.concatenate([self.moves, np.frombuffer(bytes(record.moves), dtype=np.uint8)])
+        self.offsets = np.append(self.offsets, len(self.moves))
+        self._records[len(self) - 1] = record
+
+    def save(self, path=GAMES_FILE):
+        np.savez(path, moves=self.moves, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path=GAMES_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with np.load(path) as data:
+            return cls(data['moves'], data['offsets'])
@@ -7,15 +7,146 @@ import json
 import threading
 import time
 import random # Para posibles movimientos si la búsqueda falla
+import os
+
+import bitboard
+from cache_compartido import (EXACT, LOWER, UPPER, SharedCache, decode_move, encode_move,
+                              position_key, weights_salt)
+from patrones import PATTERNS_FILE, PatternEvaluator
+
+# Pesos ajustados por entrenamiento.py. Solo se cargan si se pide (weights_file);
+# ExpectimaxClient los usa si el fichero existe
+WEIGHTS_FILE = 'pesos_ia.json'
+# Calibración de ProbCut (entrenamiento.py probcut) para la búsqueda selectiva
+PROBCUT_FILE = 'probcut.json'
+
+# Pesos posicionales del tablero de 8x8 por distancia al borde (fila, columna);
+# en tableros mayores el centro se rellena con el valor de la casilla 3-3
+EDGE_WEIGHTS = [
+    [100, -20, 10, 5],
+    [-20, -50, -2, -2],
+    [10, -2, -1, -1],
+    [5, -2, -1, 0],
+]
+
+
+# Puntuación de una partida terminada (más la diferencia de fichas): cualquier
+# victoria vale más que cualquier evaluación heurística
+WIN_SCORE = 10000
+
+# Con pocas casillas vacías se acota el resultado final con las fichas estables
+STABILITY_CUTOFF_EMPTIES = 24
+
+
+# Ventana nula de la búsqueda de variante principal (PVS): basta con que sea
+# menor que la diferencia entre dos evaluaciones distintas
+NULL_WINDOW = 0.01
+
+# Semiamplitud inicial de la ventana de aspiración en la raíz (en puntos de
+# evaluación: la matriz de pesos y las tablas de patrones usan escalas distintas)
+ASPIRATION_WINDOW = 25.0
+PATTERN_ASPIRATION_WINDOW = 4.0
+
+
+# Reserva de seguridad del reloj (latencia de red y del propio cliente)
+TIME_MARGIN = 0.1
+
+
+def move_time_budget(time_left, increment, empties):
+    """Segundos para la jugada actual: el reloj restante repartido entre las jugadas que quedan."""
+    available = max(time_left - TIME_MARGIN, 0.0)
+    moves_left = max(empties // 2, 1)  # Jugadas propias que quedan, aproximadamente
+    budget = available / (moves_left + 2) + increment * 0.8
+    return max(min(budget, available * 0.5), 0.01)
+
+
+class SearchTimeout(Exception):
+    """Se agotó el tiempo de la jugada en mitad de una iteración."""
+
+
+def default_weight_matrix(board_size=8):
+    """Matriz de pesos posicionales para un tablero de board_size x board_size."""
+    edge = [min(i, board_size - 1 - i, 3) for i in range(board_size)]
+    return np.array([[EDGE_WEIGHTS[r][c] for c in edge] for r in edge])
+
+
+# =========================================================
+# CLASE SearchStats (ESTADÍSTICAS DE UNA BÚSQUEDA)
+# =========================================================
+
+class SearchStats:
+    """Estadísticas de una llamada a get_best_move."""
+
+    def __init__(self):
+        self.nodes = 0            # Nodos visitados (incluye hojas)
+        self.leaves = 0           # Posiciones evaluadas con _evaluate
+        self.beta_cutoffs = 0     # Podas alfa/beta
+        self.tt_probes = 0        # Consultas a la tabla de transposición (si existe)
+        self.tt_hits = 0
+        self.stability_cutoffs = 0  # Líneas descartadas por las fichas estables del rival
+        self.pvs_researches = 0     # Hijos que superaron la ventana nula y se rebuscaron
+        self.probcut_cutoffs = 0    # Nodos podados por la predicción de la búsqueda corta (ProbCut)
+        self.aspiration_researches = 0  # Iteraciones que se salieron de la ventana de aspiración
+        self.depth_times = []     # Tiempo acumulado al completar cada profundidad
+        self.depth_nodes = []     # Nodos de cada iteración
+        self.principal_variation = []
+        self.best_move = None
+        self.score = None
+        self.depth = 0
+        self.time = 0.0
+
+    def effective_branching_factor(self):
+        """Crecimiento de nodos entre las dos últimas iteraciones."""
+        if len(self.depth_nodes) >= 2 and self.depth_nodes[-2]:
+            return self.depth_nodes[-1] / self.depth_nodes[-2]
+        if self.depth:
+            return self.nodes ** (1 / self.depth)
+        return 0.0
+
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def to_dict(self):
+        return {
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'beta_cutoffs': self.beta_cutoffs,
+            'depth': self.depth,
+            'time': round(self.time, 6),
+            'nps': round(self.nodes / self.time) if self.time > 0 else 0,
+            'depth_times': [round(t, 6) for t in self.depth_times],
+            'depth_nodes': self.depth_nodes,
+            'effective_branching_factor': round(self.effective_branching_factor(), 3),
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': round(self.tt_hit_rate(), 4),
+            'stability_cutoffs': self.stability_cutoffs,
+            'pvs_researches': self.pvs_researches,
+            'probcut_cutoffs': self.probcut_cutoffs,
+            'aspiration_researches': self.aspiration_researches,
+            'principal_variation': [list(m) if m else None for m in self.principal_variation],
+            'best_move': list(self.best_move) if self.best_move else None,
+            'score': float(self.score) if self.score is not None else None,
+        }
+
 
 # =========================================================
 # CLASE OthelloAI (MOTOR DEL JUEGO Y ALGORITMO DE BÚSQUEDA)
 # =========================================================
 
 class OthelloAI:
-    def __init__(self, board_size=8, depth=4):
+    def __init__(self, board_size=8, depth=4, verbose=True, weights_file=None, cache_file=None,
+                 evaluation='matrix', patterns_file=PATTERNS_FILE, selective=False,
+                 probcut_file=PROBCUT_FILE, probcut_confidence=1.0):
         self.board_size = board_size
+        self.geometry = bitboard.geometry(board_size)
         self.max_depth = depth
+        self.verbose = verbose  # False para partidas masivas (torneos, entrenamiento)
+        self.stats = SearchStats()  # Estadísticas de la búsqueda en curso
+        self.last_stats = None
+        self.pv_table = {}  # Variante principal por ply
+        self.deadline = None  # Límite duro de la búsqueda en curso (solo con reloj)
+        self.root_order = None  # Orden de los movimientos en la raíz (mejor de la iteración anterior primero)
         # Mapeo de colores para el algoritmo
         self.PLAYER_COLOR = 1 # Se establecerá después de la conexión
         self.OPPONENT_COLOR = 2 # 3 - self.PLAYER_COLOR
@@ -25,64 +156,140 @@ class OthelloAI:
         # 1. Puntuación: +1 para ficha propia.
         # 2. Movilidad: +X por cada movimiento legal.
         # 3. Estabilidad: Peso en las esquinas, bordes.
-        self.WEIGHT_MATRIX = np.array([
-            [100, -20, 10, 5, 5, 10, -20, 100],
-            [-20, -50, -2, -2, -2, -2, -50, -20],
-            [10, -2, -1, -1, -1, -1, -2, 10],
-            [5, -2, -1, 0, 0, -1, -2, 5],
-            [5, -2, -1, 0, 0, -1, -2, 5],
-            [10, -2, -1, -1, -1, -1, -2, 10],
-            [-20, -50, -2, -2, -2, -2, -50, -20],
-            [100, -20, 10, 5, 5, 10, -20, 100]
-        ])
+        self.WEIGHT_MATRIX = default_weight_matrix(board_size)
+        # Ponderación de cada término de _evaluate
+        self.position_weight = 0.8
+        self.mobility_weight = 20
+        self.disc_weight = 0.1
+        self.stability_weight = 5  # Por ficha estable (que ya no se puede voltear)
+
+        if weights_file and os.path.exists(weights_file):
+            self.load_weights(weights_file)
+
+        # Evaluación: 'matrix' (pesos por casilla + movilidad + fichas) o
+        # 'patterns' (tablas de patrones de patrones.py, solo 8x8)
+        self.patterns = None
+        if evaluation == 'patterns':
+            if board_size != 8:
+                raise ValueError("La evaluación por patrones solo admite tableros de 8x8")
+            self.patterns = PatternEvaluator.load(patterns_file)
+            if self.verbose:
+                print(f"📦 Tablas de patrones cargadas de {patterns_file}")
+        elif evaluation != 'matrix':
+            raise ValueError(f"Evaluación desconocida: {evaluation}")
+        self.aspiration_window = PATTERN_ASPIRATION_WINDOW if self.patterns is not None else ASPIRATION_WINDOW
+
+        # Huella de la evaluación: la calibración de ProbCut solo vale para ella
+        self.evaluation = evaluation
+        salt_values = [self.WEIGHT_MATRIX, self.position_weight, self.mobility_weight, self.disc_weight,
+                       self.stability_weight]
+        if self.patterns is not None:
+            salt_values = [self.patterns.tables]
+        self.evaluation_salt = weights_salt(*salt_values)
+
+        # Búsqueda selectiva (ProbCut): profundidad -> (profundidad corta, a, b, sigma)
+        self.probcut = {}
+        self.probcut_confidence = probcut_confidence
+        if selective:
+            self.load_probcut(probcut_file)
+
+        # Tabla de transposición compartida en disco (opcional)
+        self.cache = SharedCache(cache_file) if cache_file else None
+        if self.probcut:
+            # Las puntuaciones selectivas no valen como exactas para un motor sin ProbCut
+            salt_values.append([probcut_confidence] + [value for depth, params in sorted(self.probcut.items())
+                                                       for value in (depth,) + params])
+        self.cache_salt = weights_salt(*salt_values)
+
+    def load_weights(self, path):
+        """Carga la matriz de pesos y la ponderación de los términos desde JSON."""
+        with open(path) as f:
+            weights = json.load(f)
+        if len(weights['weight_matrix']) != self.board_size:
+            if self.verbose:
+                print(f"⚠️ Los pesos de {path} no son de {self.board_size}x{self.board_size}, se usan los de serie")
+            return
+        self.WEIGHT_MATRIX = np.array(weights['weight_matrix'], dtype=float)
+        self.position_weight = weights['position_weight']
+        self.mobility_weight = weights['mobility_weight']
+        self.disc_weight = weights['disc_weight']
+        # Los ficheros anteriores al término de estabilidad se ajustaron sin él
+        self.stability_weight = weights.get('stability_weight', 0.0)
+        if self.verbose:
+            print(f"📦 Pesos de evaluación cargados de {path}")
+
+    def load_probcut(self, path):
+        """Carga la calibración de ProbCut (ajuste lineal de la búsqueda profunda sobre la corta).
+
+        Las profundidades mayores que la última calibrada reutilizan su ajuste
+        con la misma reducción de profundidad. Una calibración de otro tamaño
+        de tablero o de otra evaluación (tipo o pesos) no se usa.
+        """
+        with open(path) as f:
+            calibration = json.load(f)
+        if calibration['board_size'] != self.board_size:
+            if self.verbose:
+                print(f"⚠️ La calibración de {path} no es de {self.board_size}x{self.board_size}, "
+                      f"búsqueda selectiva desactivada")
+            return
+        if (calibration.get('evaluation') != self.evaluation
+                or calibration.get('evaluation_salt') != self.evaluation_salt):
+            if self.verbose:
+                print(f"⚠️ La calibración de {path} es de otra evaluación "
+                      f"({calibration.get('evaluation', 'sin huella')}), búsqueda selectiva desactivada")
+            return
+        pairs = sorted((pair for pair in calibration['pairs'] if pair['a'] > 0), key=lambda pair: pair['depth'])
+        if not pairs:
+            return
+        for pair in pairs:
+            self.probcut[pair['depth']] = (pair['shallow'], pair['a'], pair['b'], pair['sigma'])
+        last = pairs[-1]
+        for depth in range(last['depth'] + 1, self.geometry.squares + 1):
+            self.probcut[depth] = (depth - last['depth'] + last['shallow'], last['a'], last['b'], last['sigma'])
+        if self.verbose:
+            print(f"📦 Calibración de ProbCut cargada de {path} (confianza {self.probcut_confidence})")
 
     def set_player_color(self, color):
         self.PLAYER_COLOR = color
         self.OPPONENT_COLOR = 3 - color
 
-    # --- Funciones de Othello (copia de servidor/juego01) ---
+    # --- Funciones de Othello (sobre bitboards del tamaño del tablero) ---
+
+    def _bitboards(self, board, player):
+        black, white = self.geometry.from_board(board)
+        return (black, white) if player == 1 else (white, black)
 
     def _get_valid_moves(self, board, player):
-        valid_moves = []
-        for row in range(self.board_size):
-            for col in range(self.board_size):
-                if self._is_valid_move(board, row, col, player):
-                    valid_moves.append((row, col))
-        return valid_moves
+        own, opp = self._bitboards(board, player)
+        return self.geometry.move_list(self.geometry.legal_moves(own, opp))
 
     def _is_valid_move(self, board, row, col, player):
-        if board[row][col] != 0:
-            return False
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        opponent = 3 - player
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            found_opponent = False
-            while 0 <= r < self.board_size and 0 <= c < self.board_size and board[r][c] == opponent:
-                found_opponent = True
-                r += dr
-                c += dc
-            if found_opponent and 0 <= r < self.board_size and 0 <= c < self.board_size and board[r][c] == player:
-                return True
-        return False
+        own, opp = self._bitboards(board, player)
+        return bool(self.geometry.legal_moves(own, opp) >> self.geometry.to_index(row, col) & 1)
 
     def _make_move(self, board, row, col, player):
-        new_board = np.copy(board)
-        new_board[row][col] = player
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        opponent = 3 - player
-
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            to_flip = []
-            while 0 <= r < self.board_size and 0 <= c < self.board_size and new_board[r][c] == opponent:
-                to_flip.append((r, c))
-                r += dr
-                c += dc
-            if 0 <= r < self.board_size and 0 <= c < self.board_size and new_board[r][c] == player:
-                for flip_row, flip_col in to_flip:
-                    new_board[flip_row][flip_col] = player
-        return new_board
+        own, opp = self._bitboards(board, player)
+        own, opp = self.geometry.play(own, opp, self.geometry.to_index(row, col))
+        black, white = (own, opp) if player == 1 else (opp, own)
+        return self.geometry.to_array(black, white)
+
+    def _apply_move(self, board, move, player):
+        """_make_move dentro de la búsqueda: además actualiza los índices de patrones.
+
+        Cada llamada se empareja con _undo_move al volver de la recursión.
+        """
+        own, opp = self._bitboards(board, player)
+        index = self.geometry.to_index(move[0], move[1])
+        flipped = self.geometry.flips(own, opp, 1 << index)
+        if self.patterns is not None:
+            self.patterns.make(index, player, flipped)
+        own, opp = own | (1 << index) | flipped, opp & ~flipped
+        black, white = (own, opp) if player == 1 else (opp, own)
+        return self.geometry.to_array(black, white)
+
+    def _undo_move(self):
+        if self.patterns is not None:
+            self.patterns.unmake()
 
     # --- Función de Evaluación (Heurística) ---
 
@@ -92,116 +299,359 @@ class OthelloAI:
         Evalúa el estado del tablero desde la perspectiva de self.PLAYER_COLOR.
         Mayor valor = mejor para el jugador de la IA.
         """
+        if self.patterns is not None:
+            # Índices mantenidos por _apply_move/_undo_move; la tabla puntúa para las negras
+            score = self.patterns.score()
+            return score if self.PLAYER_COLOR == 1 else -score
+
         score = 0
+        own, opp = self._bitboards(board, self.PLAYER_COLOR)
         
         # 1. Puntuación de Posición (Estabilidad y Valor de las celdas)
         # Se beneficia de ocupar esquinas y celdas con alto peso
         player_score_matrix = np.sum((board == self.PLAYER_COLOR) * self.WEIGHT_MATRIX)
         opponent_score_matrix = np.sum((board == self.OPPONENT_COLOR) * self.WEIGHT_MATRIX)
         
-        score += (player_score_matrix - opponent_score_matrix) * 0.8
+        score += (player_score_matrix - opponent_score_matrix) * self.position_weight
         
         # 2. Movilidad (Número de movimientos legales disponibles)
         # Un mayor número de movimientos legales suele ser una ventaja
-        player_moves = len(self._get_valid_moves(board, self.PLAYER_COLOR))
-        opponent_moves = len(self._get_valid_moves(board, self.OPPONENT_COLOR))
+        player_moves = self.geometry.legal_moves(own, opp).bit_count()
+        opponent_moves = self.geometry.legal_moves(opp, own).bit_count()
         
         # Evitar división por cero
         if player_moves + opponent_moves != 0:
             mobility = (player_moves - opponent_moves) / (player_moves + opponent_moves)
-            score += mobility * 20 # Ponderación alta para la movilidad
+            score += mobility * self.mobility_weight # Ponderación alta para la movilidad
             
         # 3. Puntuación Bruta (para desempate o juego tardío)
-        player_count = np.sum(board == self.PLAYER_COLOR)
-        opponent_count = np.sum(board == self.OPPONENT_COLOR)
-        score += (player_count - opponent_count) * 0.1
+        player_count = own.bit_count()
+        opponent_count = opp.bit_count()
+        score += (player_count - opponent_count) * self.disc_weight
+
+        # 4. Estabilidad (fichas que ya no se pueden voltear)
+        if self.stability_weight:
+            player_stable = self.geometry.stable(own, opp).bit_count()
+            opponent_stable = self.geometry.stable(opp, own).bit_count()
+            score += (player_stable - opponent_stable) * self.stability_weight
         
         return score
 
+    def _final_score(self, disc_diff):
+        """Puntuación de una partida terminada con `disc_diff` fichas de ventaja para la IA."""
+        if self.patterns is not None:
+            return float(disc_diff)  # Las tablas ya puntúan en fichas de diferencia final
+        return float(np.sign(disc_diff) * WIN_SCORE + disc_diff)
+
+    # --- Tabla de transposición compartida ---
+
+    def _cache_probe(self, key):
+        """Entrada de la caché desde el punto de vista de la IA: (profundidad, cota, puntuación, movimiento)."""
+        self.stats.tt_probes += 1
+        entry = self.cache.probe(key)
+        if entry is None:
+            return None
+        self.stats.tt_hits += 1
+        depth, bound, move, score = entry
+        if self.PLAYER_COLOR == 2:
+            # La caché guarda la puntuación de las negras
+            score = -score
+            bound = {LOWER: UPPER, UPPER: LOWER}.get(bound, bound)
+        return depth, bound, score, decode_move(move)
+
+    def _cache_store(self, key, depth, score, move, alpha, beta):
+        if score <= alpha:
+            bound = UPPER
+        elif score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        if self.PLAYER_COLOR == 2:
+            score = -score
+            bound = {LOWER: UPPER, UPPER: LOWER}.get(bound, bound)
+        self.cache.store(key, depth, bound, encode_move(move), float(score))
+
     # --- Algoritmo Minimax con Poda Alfa-Beta ---
 
-    def _minimax(self, board, depth, alpha, beta, is_maximizing_player):
+    def _minimax(self, board, depth, alpha, beta, is_maximizing_player, ply=0):
         """
         Implementación recursiva del algoritmo Minimax con Poda Alfa-Beta.
+
+        Búsqueda de variante principal: el primer movimiento (el mejor según
+        la ordenación) se busca con la ventana completa y el resto con una
+        ventana nula que solo comprueba que no lo mejoran; si alguno lo
+        mejora, se vuelve a buscar con la ventana completa.
         """
+        stats = self.stats
+        stats.nodes += 1
+        if self.deadline and not stats.nodes & 255 and time.time() > self.deadline:
+            raise SearchTimeout()
+        self.pv_table[ply] = []
         if depth == 0:
+            stats.leaves += 1
             return self._evaluate(board), None
 
         # Verificar si el juego terminó (no hay movimientos válidos para ambos)
         player_to_move = self.PLAYER_COLOR if is_maximizing_player else self.OPPONENT_COLOR
-        opponent_to_move = self.OPPONENT_COLOR if is_maximizing_player else self.PLAYER_COLOR
-
-        valid_moves = self._get_valid_moves(board, player_to_move)
+        own, opp = self._bitboards(board, player_to_move)
+        squares = self.geometry.squares
+
+        # Final de partida: las fichas estables de un bando no cambiarán de color,
+        # así que acotan el mejor resultado posible. Si ni ese resultado mejora
+        # lo que ya hay (alfa para la IA, beta para el rival), la línea no sirve.
+        # En la raíz no: ahí hace falta una jugada, no solo una cota.
+        if ply > 0 and squares - (own | opp).bit_count() <= STABILITY_CUTOFF_EMPTIES:
+            if is_maximizing_player:
+                bound = self._final_score(squares - 2 * self.geometry.stable(opp, own).bit_count())
+                if bound <= alpha:
+                    stats.stability_cutoffs += 1
+                    return bound, None
+            else:
+                bound = self._final_score(2 * self.geometry.stable(opp, own).bit_count() - squares)
+                if bound >= beta:
+                    stats.stability_cutoffs += 1
+                    return bound, None
+
+        # Consulta a la caché (en la raíz solo se usa para ordenar)
+        key = hash_move = None
+        alpha_orig, beta_orig = alpha, beta
+        if self.cache is not None:
+            key = position_key(board, player_to_move, self.cache_salt)
+            entry = self._cache_probe(key)
+            if entry is not None:
+                entry_depth, bound, score, hash_move = entry
+                if entry_depth >= depth and ply > 0:
+                    if bound == EXACT:
+                        return score, hash_move
+                    if bound == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score, hash_move
+
+        # ProbCut: la búsqueda corta predice la profunda (profunda ≈ a * corta + b,
+        # con error típico sigma, ajustado desde el bando al turno). Si la
+        # predicción queda fuera de (alfa, beta) con la confianza pedida, se poda.
+        # Con puntuaciones de final de partida (exactas) no se aplica.
+        if ply > 0 and depth in self.probcut:
+            shallow, a, b, sigma = self.probcut[depth]
+            if not is_maximizing_player:
+                b = -b  # La calibración es desde el bando al turno; aquí se puntúa para la IA
+            margin = self.probcut_confidence * sigma
+            if abs(beta) < WIN_SCORE:
+                bound = (beta - b + margin) / a
+                eval, _ = self._minimax(board, shallow, bound - NULL_WINDOW, bound, is_maximizing_player, ply)
+                if eval >= bound:
+                    stats.probcut_cutoffs += 1
+                    self.pv_table[ply] = []  # La búsqueda corta dejó aquí su variante
+                    return beta, None
+            if abs(alpha) < WIN_SCORE:
+                bound = (alpha - b - margin) / a
+                eval, _ = self._minimax(board, shallow, bound, bound + NULL_WINDOW, is_maximizing_player, ply)
+                if eval <= bound:
+                    stats.probcut_cutoffs += 1
+                    self.pv_table[ply] = []
+                    return alpha, None
+
+        valid_moves = self.geometry.move_list(self.geometry.legal_moves(own, opp))
         
         if not valid_moves:
             # Si el jugador actual no tiene movimientos, el turno pasa al oponente
-            opponent_moves = self._get_valid_moves(board, opponent_to_move)
-            
-            if not opponent_moves:
-                # Si ninguno tiene movimientos, es el final del juego
-                return self._evaluate(board), None # Evaluar el estado final
+            if not self.geometry.legal_moves(opp, own):
+                # Si ninguno tiene movimientos, es el final del juego: resultado exacto
+                stats.leaves += 1
+                disc_diff = own.bit_count() - opp.bit_count()
+                return self._final_score(disc_diff if is_maximizing_player else -disc_diff), None
             else:
                 # Simular un "paso de turno"
-                return self._minimax(board, depth - 1, alpha, beta, not is_maximizing_player)
+                eval, _ = self._minimax(board, depth - 1, alpha, beta, not is_maximizing_player, ply + 1)
+                self.pv_table[ply] = [None] + self.pv_table[ply + 1]
+                if key is not None:
+                    self._cache_store(key, depth, eval, None, alpha_orig, beta_orig)
+                return eval, None
+
+        if hash_move in valid_moves:
+            valid_moves.remove(hash_move)
+            valid_moves.insert(0, hash_move)
+        if ply == 0 and self.root_order:
+            # En la raíz se prueba primero el mejor movimiento de la iteración anterior
+            valid_moves = [m for m in self.root_order if m in valid_moves] + \
+                          [m for m in valid_moves if m not in self.root_order]
 
         best_move = valid_moves[0] # Inicializar con el primer movimiento válido
 
         if is_maximizing_player:
             max_eval = -np.inf
-            for move in valid_moves:
-                new_board = self._make_move(board, move[0], move[1], player_to_move)
+            for i, move in enumerate(valid_moves):
+                new_board = self._apply_move(board, move, player_to_move)
                 # El siguiente estado es del oponente (minimizing)
-                eval, _ = self._minimax(new_board, depth - 1, alpha, beta, False) 
+                if i == 0 or alpha + NULL_WINDOW >= beta:
+                    eval, _ = self._minimax(new_board, depth - 1, alpha, beta, False, ply + 1)
+                else:
+                    eval, _ = self._minimax(new_board, depth - 1, alpha, alpha + NULL_WINDOW, False, ply + 1)
+                    if alpha < eval < beta:
+                        stats.pvs_researches += 1
+                        eval, _ = self._minimax(new_board, depth - 1, alpha, beta, False, ply + 1)
+                self._undo_move()
                 
                 if eval > max_eval:
                     max_eval = eval
                     best_move = move
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
                     
                 alpha = max(alpha, max_eval)
                 if beta <= alpha:
+                    stats.beta_cutoffs += 1
                     break # Poda Beta
+            if key is not None:
+                self._cache_store(key, depth, max_eval, best_move, alpha_orig, beta_orig)
             return max_eval, best_move
         else: # Minimizing player
             min_eval = np.inf
-            for move in valid_moves:
-                new_board = self._make_move(board, move[0], move[1], player_to_move)
+            for i, move in enumerate(valid_moves):
+                new_board = self._apply_move(board, move, player_to_move)
                 # El siguiente estado es del jugador IA (maximizing)
-                eval, _ = self._minimax(new_board, depth - 1, alpha, beta, True) 
+                if i == 0 or beta - NULL_WINDOW <= alpha:
+                    eval, _ = self._minimax(new_board, depth - 1, alpha, beta, True, ply + 1)
+                else:
+                    eval, _ = self._minimax(new_board, depth - 1, beta - NULL_WINDOW, beta, True, ply + 1)
+                    if alpha < eval < beta:
+                        stats.pvs_researches += 1
+                        eval, _ = self._minimax(new_board, depth - 1, alpha, beta, True, ply + 1)
+                self._undo_move()
 
                 if eval < min_eval:
                     min_eval = eval
                     best_move = move
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
                     
                 beta = min(beta, min_eval)
                 if beta <= alpha:
+                    stats.beta_cutoffs += 1
                     break # Poda Alfa
+            if key is not None:
+                self._cache_store(key, depth, min_eval, best_move, alpha_orig, beta_orig)
             return min_eval, best_move
             
-    def get_best_move(self, current_board_list):
-        """Función pública para iniciar la búsqueda."""
+    def _search_root(self, board, depth, guess):
+        """Búsqueda de la raíz con ventana de aspiración centrada en `guess`.
+
+        `guess` es la puntuación de la iteración anterior. Si el resultado
+        cae fuera de la ventana, se ensancha por ese lado y se repite.
+        """
+        if guess is None or abs(guess) >= WIN_SCORE:
+            # Primera iteración o partida ya decidida: ventana completa
+            return self._minimax(board, depth, -np.inf, np.inf, True)
+
+        delta = self.aspiration_window
+        alpha, beta = guess - delta, guess + delta
+        while True:
+            eval, best_move = self._minimax(board, depth, alpha, beta, True)
+            if alpha < eval < beta:
+                return eval, best_move
+            self.stats.aspiration_researches += 1
+            delta *= 4
+            if eval <= alpha:
+                alpha = eval - delta if delta < WIN_SCORE else -np.inf
+            else:
+                beta = eval + delta if delta < WIN_SCORE else np.inf
+
+    def get_best_move(self, current_board_list, stats=None, time_left=None, increment=0.0):
+        """Función pública para iniciar la búsqueda.
+
+        Profundización iterativa: cada iteración ordena primero el mejor
+        movimiento de la anterior. Sin reloj se llega hasta self.max_depth;
+        con `time_left` (segundos que quedan en el reloj) se reparte el
+        tiempo entre las jugadas restantes y se profundiza mientras la
+        siguiente iteración quepa en el presupuesto. Las estadísticas se
+        guardan en `stats` (si se pasa) y siempre en self.last_stats.
+        """
         # Convertir lista a numpy array para la AI
         current_board = np.array(current_board_list)
-        
-        # Buscar el mejor movimiento
-        print(f"🧠 IA pensando... (Profundidad: {self.max_depth})")
         start_time = time.time()
-        
-        # Maximizing player es siempre la IA (self.PLAYER_COLOR)
-        eval, best_move = self._minimax(
-            board=current_board, 
-            depth=self.max_depth, 
-            alpha=-np.inf, 
-            beta=np.inf, 
-            is_maximizing_player=True
-        )
-        
+        self.stats = stats if stats is not None else SearchStats()
+        self.root_order = None
+        if self.patterns is not None:
+            self.patterns.set_board(current_board)  # Por si la búsqueda anterior se interrumpió
+
+        if time_left is None:
+            max_depth, budget = self.max_depth, None
+            if self.verbose:
+                print(f"🧠 IA pensando... (Profundidad: {self.max_depth})")
+        else:
+            empties = int(np.sum(current_board == 0))
+            max_depth = max(empties, 1)
+            budget = move_time_budget(time_left, increment, empties)
+            # Límite duro: una iteración que se alarga no puede hacer caer la bandera
+            self.deadline = start_time + min(budget * 3, max(time_left - TIME_MARGIN, 0.0) * 0.5)
+            if self.verbose:
+                print(f"🧠 IA pensando... ({budget:.2f}s de {time_left:.1f}s)")
+
+        eval, best_move = None, None
+        try:
+            for depth in range(1, max_depth + 1):
+                nodes_before = self.stats.nodes
+                iteration_start = time.time()
+                # Maximizing player es siempre la IA (self.PLAYER_COLOR)
+                eval, best_move = self._search_root(current_board, depth, eval)
+                self.stats.depth = depth
+                self.stats.depth_times.append(time.time() - start_time)
+                self.stats.depth_nodes.append(self.stats.nodes - nodes_before)
+                self.stats.principal_variation = list(self.pv_table.get(0, []))
+                if best_move is None:
+                    break  # Sin movimientos en la raíz
+                self.root_order = [best_move]
+                if budget is not None:
+                    # ¿Cabe la siguiente iteración? Se estima con el factor de ramificación
+                    elapsed = time.time() - start_time
+                    growth = max(self.stats.effective_branching_factor(), 2.0)
+                    if elapsed + (time.time() - iteration_start) * growth > budget:
+                        break
+        except SearchTimeout:
+            if best_move is None:
+                # Ni siquiera terminó la primera iteración
+                moves = self._get_valid_moves(current_board, self.PLAYER_COLOR)
+                best_move = moves[0] if moves else None
+        finally:
+            self.deadline = None
+
         end_time = time.time()
-        
-        print(f"✅ Búsqueda terminada en {end_time - start_time:.2f}s. Evaluación: {eval:.2f}. Movimiento: {best_move}")
-        
+        self.stats.time = end_time - start_time
+        self.stats.best_move = best_move
+        self.stats.score = eval
+        self.last_stats = self.stats
+
+        if self.verbose:
+            score_text = f"{eval:.2f}" if eval is not None else "-"
+            print(f"✅ Búsqueda terminada en {end_time - start_time:.2f}s (prof. {self.stats.depth}). "
+                  f"Evaluación: {score_text}. Movimiento: {best_move}")
+
         return best_move
 
 
+    def analyze_moves(self, current_board_list, depth, should_stop=None):
+        """Puntuación de cada movimiento legal de PLAYER_COLOR a la profundidad dada.
+
+        A diferencia de get_best_move, cada movimiento se busca con ventana
+        completa, así que las puntuaciones son exactas y comparables entre sí.
+        Si `should_stop()` se cumple entre dos movimientos se devuelve None.
+        """
+        board = np.array(current_board_list)
+        self.stats = SearchStats()
+        if self.patterns is not None:
+            self.patterns.set_board(board)
+        scores = []
+        for move in self._get_valid_moves(board, self.PLAYER_COLOR):
+            if should_stop and should_stop():
+                return None
+            new_board = self._apply_move(board, move, self.PLAYER_COLOR)
+            score, _ = self._minimax(new_board, depth - 1, -np.inf, np.inf, False, ply=1)
+            self._undo_move()
+            scores.append((move, score))
+        return scores
+
+
 # =========================================================
 # CLASE ExpectimaxClient (CLIENTE DE RED SIMPLIFICADO)
 # =========================================================
@@ -212,7 +662,7 @@ BOARD_SIZE = 8
 CELL_SIZE = WIDTH // BOARD_SIZE
 
 class ExpectimaxClient:
-    def __init__(self, host='localhost', port=5555):
+    def __init__(self, host='localhost', port=5555, stats_file=None, engine='minimax', cache_file=None):
         self.host = host
         self.port = port
         self.socket = None
@@ -220,8 +670,17 @@ class ExpectimaxClient:
         self.game_state = None
         self.connected = False
         self.connection_status = "Desconectado"
-        self.ai = OthelloAI(depth=5) # Crear la instancia de la IA
-        self.last_move_time = 0
+        self.engine = engine
+        self.cache_file = cache_file
+        self.ai = self.create_ai(BOARD_SIZE)
+        self.stats_file = stats_file  # JSON lines con las estadísticas de cada búsqueda
+
+    def create_ai(self, board_size):
+        """Instancia de la IA (alpha-beta o MCTS, misma interfaz) para el tamaño de tablero dado."""
+        if self.engine == 'mcts':
+            from mcts import MCTSAI
+            return MCTSAI(board_size=board_size, time_limit=2.0)
+        return OthelloAI(board_size=board_size, depth=5, weights_file=WEIGHTS_FILE, cache_file=self.cache_file)
 
     def connect(self):
         # ... (Mantener la lógica de conexión similar a cliente.py)
@@ -237,6 +696,8 @@ class ExpectimaxClient:
             receive_thread = threading.Thread(target=self.receive_messages)
             receive_thread.daemon = True
             receive_thread.start()
+            # Sin game_id el servidor nos sienta en su sala por defecto
+            self.send_message({'type': 'join'})
             return True
         except Exception as e:
             self.connection_status = f"Error de conexión: {str(e)}"
@@ -280,6 +741,12 @@ class ExpectimaxClient:
 
         elif msg_type == 'game_start' or msg_type == 'game_update':
             self.game_state = message['game_state']
+            board_size = self.game_state.get('board_size', len(self.game_state['board']))
+            if board_size != self.ai.board_size:
+                # El servidor juega con otro tamaño de tablero
+                print(f"📐 Tablero de {board_size}x{board_size}")
+                self.ai = self.create_ai(board_size)
+                self.ai.set_player_color(self.player_color)
             
             # Llamar a la lógica de la IA
             self.process_turn()
@@ -315,10 +782,6 @@ class ExpectimaxClient:
             return
 
         if self.game_state['current_player'] == self.player_color:
-            current_time = time.time()
-            if current_time - self.last_move_time < 1.0: # Esperar un poco para no saturar
-                time.sleep(1.0 - (current_time - self.last_move_time))
-            
             print("🚀 Es mi turno. Calculando mejor movimiento...")
             
             # 1. Obtener el tablero y movimientos
@@ -329,8 +792,14 @@ class ExpectimaxClient:
                 print("⚠️ No hay movimientos válidos, pasar turno (el servidor lo maneja)")
                 return
             
-            # 2. Obtener el mejor movimiento de la IA
-            best_move = self.ai.get_best_move(board_list)
+            # 2. Obtener el mejor movimiento de la IA (con reloj, el tiempo lo decide la IA)
+            clocks = self.game_state.get('clocks')
+            if clocks:
+                time_left = clocks['black' if self.player_color == 1 else 'white']
+                best_move = self.ai.get_best_move(board_list, time_left=time_left, increment=clocks['increment'])
+            else:
+                best_move = self.ai.get_best_move(board_list)
+            self.log_search_stats(self.ai.last_stats)
             
             # Si la búsqueda de la IA no encuentra un movimiento válido (debería encontrarlo)
             if best_move not in [(m[0], m[1]) for m in valid_moves]:
@@ -341,10 +810,20 @@ class ExpectimaxClient:
             # 3. Enviar el movimiento
             row, col = best_move
             self.send_move(row, col)
-            self.last_move_time = time.time()
         else:
             print("⏳ Es turno del oponente, esperando...")
 
+    def log_search_stats(self, stats):
+        """Muestra un resumen de la búsqueda y, si se pidió, la exporta como JSON lines."""
+        print(f"📈 {stats.nodes} nodos ({stats.leaves} hojas, {stats.beta_cutoffs} podas) "
+              f"prof. {stats.depth}, EBF {stats.effective_branching_factor():.2f}, "
+              f"caché {stats.tt_hit_rate():.0%}, PV {stats.principal_variation}")
+        if self.stats_file:
+            record = {'time': time.time(), 'player': self.player_color}
+            record.update(stats.to_dict())
+            with open(self.stats_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
 
     def run(self):
         if not self.connect():
@@ -369,6 +848,9 @@ if __name__ == "__main__":
     host = input("Servidor [localhost]: ").strip() or 'localhost'
     port_input = input("Puerto [5555]: ").strip()
     port = int(port_input) if port_input.isdigit() else 5555
+    stats_file = input("Estadísticas JSONL [no]: ").strip() or None
+    engine = input("Motor (minimax/mcts) [minimax]: ").strip() or 'minimax'
+    cache_file = input("Caché compartida (p. ej. cache_ia.bin) [no]: ").strip() or None
 
-    client = ExpectimaxClient(host, port)
+    client = ExpectimaxClient(host, port, stats_file, engine, cache_file)
     client.run()
\ No newline at end of file
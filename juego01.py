@@ -2,8 +2,8 @@ import pygame
 import sys
 import numpy as np
 
-# Inicializar Pygame
-pygame.init()
+from historial import GameArchive, GameRecord
+from renderizado import FrameScheduler, TextCache, headless_requested, init_pygame, load_logo
 
 # Constantes
 BOARD_SIZE = 8
@@ -23,17 +23,35 @@ WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GRAY = (200, 200, 200)
 HIGHLIGHT = (255, 255, 0, 100)  # Amarillo semitransparente
+YELLOW = (255, 255, 0)
+
+# Barra de desplazamiento del modo repetición (parte baja de la franja superior)
+SCRUB_RECT = pygame.Rect(10, INFO_HEIGHT - 12, WIDTH - 20, 8)
 
 
 class OthelloGame:
-    def __init__(self):
+    def __init__(self, headless=False):
+        # Inicializar Pygame (en modo headless: drivers dummy de SDL, sin assets)
+        init_pygame(headless)
+        self.headless = headless
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("Sistemas Inteligentes")
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(60)
 
         # Logo
-        self.logo = pygame.image.load("intro.png")
-        self.logo = pygame.transform.scale(self.logo, (80, 80))
+        self.logo = load_logo(headless)
+
+        # Fuentes resueltas una sola vez y caché de textos renderizados
+        self.font = pygame.font.SysFont('Arial', 28, bold=True)
+        self.text_cache = TextCache()
+        self.hud_layer = pygame.Surface((WIDTH, INFO_HEIGHT)).convert()
+        self.hud_key = None
+
+        # Partidas guardadas (se cargan con L) y estado del modo repetición
+        self.archive = None
+        self.replay_record = None
+        self.replay_ply = 0
+        self.replay_index = None
 
         self.reset_game()
 
@@ -49,17 +67,24 @@ class OthelloGame:
         self.board[mid][mid - 1] = 1  # Negro
 
         self.current_player = 1  # Negro empieza
+        self.update_counts()
         self.valid_moves = self.get_valid_moves()
         self.game_over = False
         self.winner = None
+        self.history = GameRecord()
+        self.history_saved = False  # La partida en curso ya está en el archivo
+        self.replay_record = None
+
+    def display_board(self):
+        """Tablero a dibujar: el de la partida o el de la posición de la repetición."""
+        if self.replay_record is not None:
+            return self.replay_record.board_at(self.replay_ply)[0]
+        return self.board
 
     def draw_board(self):
         # Fondo tablero
         self.screen.fill(BACKGROUND)
 
-        # Franja negra superior
-        pygame.draw.rect(self.screen, BLACK, (0, 0, WIDTH, INFO_HEIGHT))
-
         # Líneas del tablero (desplazadas hacia abajo)
         for i in range(BOARD_SIZE + 1):
             # Horizontales
@@ -79,13 +104,14 @@ class OthelloGame:
                                    (i * CELL_SIZE, INFO_HEIGHT + j * CELL_SIZE), 5)
 
         # Fichas
+        board = self.display_board()
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
-                if self.board[row][col] != 0:
-                    self.draw_piece(row, col)
+                if board[row][col] != 0:
+                    self.draw_piece(row, col, board[row][col])
 
         # Movimientos válidos
-        if not self.game_over:
+        if not self.game_over and self.replay_record is None:
             for row, col in self.valid_moves:
                 center_x = col * CELL_SIZE + CELL_SIZE // 2
                 center_y = INFO_HEIGHT + row * CELL_SIZE + CELL_SIZE // 2
@@ -98,39 +124,81 @@ class OthelloGame:
         # Información del juego
         self.draw_game_info()
 
-    def draw_piece(self, row, col):
+    def draw_piece(self, row, col, value):
         center_x = col * CELL_SIZE + CELL_SIZE // 2
         center_y = INFO_HEIGHT + row * CELL_SIZE + CELL_SIZE // 2
-        color = BLACK if self.board[row][col] == 1 else WHITE
+        color = BLACK if value == 1 else WHITE
         pygame.draw.circle(self.screen, color, (center_x, center_y), DOT_RADIUS)
-        border_color = WHITE if self.board[row][col] == 1 else BLACK
+        border_color = WHITE if value == 1 else BLACK
         pygame.draw.circle(self.screen, border_color, (center_x, center_y), DOT_RADIUS, 2)
 
-    def draw_game_info(self):
-        font = pygame.font.SysFont('Arial', 28, bold=True)
+    def update_counts(self):
+        """Recalcula el marcador; solo hace falta cuando cambia el tablero."""
+        self.black_count = int(np.sum(self.board == 1))
+        self.white_count = int(np.sum(self.board == 2))
 
-        # Contar fichas
-        black_count = np.sum(self.board == 1)
-        white_count = np.sum(self.board == 2)
+    def render_hud(self):
+        """Renderiza la franja superior solo cuando cambian turno o marcador."""
+        if self.replay_record is not None:
+            self.render_replay_hud()
+            return
+
+        hud_key = (self.current_player, self.black_count, self.white_count)
+        if hud_key == self.hud_key:
+            return
+        self.hud_key = hud_key
+
+        self.hud_layer.fill(BLACK)
 
         # Turno actual (a la izquierda)
         logo_text = "Hello class, I wanna play a game!"
         player_text = "Turno: " + ("Negro" if self.current_player == 1 else "Blanco")
-        player_surface = font.render(player_text, True, WHITE)
-        logo_surface = font.render(logo_text, True, RED)
-        self.screen.blit(player_surface, (20, 50))
-        self.screen.blit(logo_surface, (20, 15))
+        player_surface = self.text_cache.render(self.font, player_text, WHITE)
+        logo_surface = self.text_cache.render(self.font, logo_text, RED)
+        self.hud_layer.blit(player_surface, (20, 50))
+        self.hud_layer.blit(logo_surface, (20, 15))
 
         # Marcador en el centro
-        count_text = f"Negro: {black_count}  Blanco: {white_count}"
-        count_surface = font.render(count_text, True, WHITE)
-        self.screen.blit(count_surface, (WIDTH // 2 - count_surface.get_width() // 5, 50))
+        count_text = f"Negro: {self.black_count}  Blanco: {self.white_count}"
+        count_surface = self.text_cache.render(self.font, count_text, WHITE)
+        self.hud_layer.blit(count_surface, (WIDTH // 2 - count_surface.get_width() // 5, 50))
 
         # Logo a la derecha
-        self.screen.blit(self.logo, (WIDTH - 100, 10))
+        self.hud_layer.blit(self.logo, (WIDTH - 100, 10))
+
+    def render_replay_hud(self):
+        """Franja superior del modo repetición: jugada actual, marcador y barra de desplazamiento."""
+        total = len(self.replay_record)
+        hud_key = ('replay', self.replay_index, self.replay_ply, total)
+        if hud_key == self.hud_key:
+            return
+        self.hud_key = hud_key
+
+        board, player = self.replay_record.board_at(self.replay_ply)
+        game_text = f"Partida {self.replay_index + 1}/{len(self.archive)}" if self.replay_index is not None \
+            else "Partida actual"
+        ply_text = f"Repetición - jugada {self.replay_ply}/{total}"
+        count_text = f"Negro: {int(np.sum(board == 1))}  Blanco: {int(np.sum(board == 2))}"
+
+        self.hud_layer.fill(BLACK)
+        self.hud_layer.blit(self.text_cache.render(self.font, game_text, YELLOW), (20, 10))
+        self.hud_layer.blit(self.text_cache.render(self.font, ply_text, WHITE), (20, 45))
+        count_surface = self.text_cache.render(self.font, count_text, WHITE)
+        self.hud_layer.blit(count_surface, (WIDTH - count_surface.get_width() - 20, 45))
+
+        # Barra de desplazamiento
+        pygame.draw.rect(self.hud_layer, GRAY, SCRUB_RECT, 1)
+        if total:
+            filled = SCRUB_RECT.copy()
+            filled.width = SCRUB_RECT.width * self.replay_ply // total
+            pygame.draw.rect(self.hud_layer, YELLOW, filled)
+
+    def draw_game_info(self):
+        self.render_hud()
+        self.screen.blit(self.hud_layer, (0, 0))
 
         # Fin de juego
-        if self.game_over:
+        if self.game_over and self.replay_record is None:
             overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
             overlay.fill((0, 0, 0, 128))  # Fondo semitransparente
             self.screen.blit(overlay, (0, 0))
@@ -140,8 +208,8 @@ class OthelloGame:
             else:
                 result_text = f"¡{'Negro' if self.winner == 1 else 'Blanco'} gana!"
 
-            result_surface = font.render(result_text, True, WHITE)
-            restart_surface = font.render("Presiona R para reiniciar", True, WHITE)
+            result_surface = self.text_cache.render(self.font, result_text, WHITE)
+            restart_surface = self.text_cache.render(self.font, "Presiona R para reiniciar", WHITE)
 
             self.screen.blit(result_surface, (WIDTH // 2 - result_surface.get_width() // 2, HEIGHT // 2 - 30))
             self.screen.blit(restart_surface, (WIDTH // 2 - restart_surface.get_width() // 2, HEIGHT // 2 + 30))
@@ -203,6 +271,8 @@ class OthelloGame:
                     self.board[flip_row][flip_col] = self.current_player
 
         self.current_player = 3 - self.current_player
+        self.update_counts()
+        self.history.append(row, col)
         self.valid_moves = self.get_valid_moves()
 
         if not self.valid_moves:
@@ -216,8 +286,8 @@ class OthelloGame:
         return True
 
     def determine_winner(self):
-        black_count = np.sum(self.board == 1)
-        white_count = np.sum(self.board == 2)
+        black_count = self.black_count
+        white_count = self.white_count
 
         if black_count > white_count:
             self.winner = 1
@@ -226,7 +296,66 @@ class OthelloGame:
         else:
             self.winner = 0
 
+    # --- Modo repetición ---
+
+    def start_replay(self, record, index=None):
+        self.replay_record = record
+        self.replay_index = index
+        self.replay_ply = len(record)
+
+    def stop_replay(self):
+        self.replay_record = None
+        self.hud_key = None
+
+    def seek(self, ply):
+        """Salta a cualquier jugada: se reconstruye desde la instantánea más cercana."""
+        self.replay_ply = max(0, min(ply, len(self.replay_record)))
+
+    def load_archive(self):
+        self.archive = GameArchive.load()
+        print(f"📂 {len(self.archive)} partidas cargadas")
+        if len(self.archive):
+            self.start_replay(self.archive[len(self.archive) - 1], len(self.archive) - 1)
+
+    def save_current_game(self):
+        if self.history_saved:
+            print("💾 Esta partida ya está guardada")
+            return
+        if self.archive is None:
+            self.archive = GameArchive.load()
+        # Copia: las jugadas que se hagan después no pertenecen a la partida guardada
+        self.archive.append(GameRecord(bytes(self.history.moves)))
+        self.archive.save()
+        self.history_saved = True
+        print(f"💾 Partida guardada ({len(self.archive)} en total)")
+
+    def open_archived_game(self, index):
+        if self.archive is not None and 0 <= index < len(self.archive):
+            self.start_replay(self.archive[index], index)
+
+    def scrub_to(self, x):
+        ratio = (x - SCRUB_RECT.left) / SCRUB_RECT.width
+        self.seek(round(ratio * len(self.replay_record)))
+
+    def handle_replay_key(self, key):
+        steps = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1, pygame.K_PAGEUP: -10, pygame.K_PAGEDOWN: 10}
+        if key in steps:
+            self.seek(self.replay_ply + steps[key])
+        elif key == pygame.K_HOME:
+            self.seek(0)
+        elif key == pygame.K_END:
+            self.seek(len(self.replay_record))
+        elif key == pygame.K_UP and self.replay_index is not None:
+            self.open_archived_game(self.replay_index - 1)
+        elif key == pygame.K_DOWN and self.replay_index is not None:
+            self.open_archived_game(self.replay_index + 1)
+
     def handle_click(self, pos):
+        if self.replay_record is not None:
+            if pos[1] < INFO_HEIGHT:
+                self.scrub_to(pos[0])
+            return
+
         if self.game_over:
             return
 
@@ -240,26 +369,51 @@ class OthelloGame:
         running = True
 
         while running:
-            for event in pygame.event.get():
+            # Bloquea hasta que haya entrada: sin cambios no se redibuja nada
+            for event in self.scheduler.wait_events():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:  # Click izquierdo
                         self.handle_click(event.pos)
+                        self.scheduler.request_frame()
+                elif event.type == pygame.MOUSEMOTION:
+                    # Arrastrar sobre la franja superior en modo repetición
+                    if self.replay_record is not None and event.buttons[0] and event.pos[1] < INFO_HEIGHT:
+                        self.scrub_to(event.pos[0])
+                        self.scheduler.request_frame()
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_r:  # Reiniciar
                         self.reset_game()
+                        self.scheduler.request_frame()
                     elif event.key == pygame.K_ESCAPE:  # Salir
                         running = False
-
-            self.draw_board()
-            pygame.display.flip()
-            self.clock.tick(60)
+                    elif event.key == pygame.K_v:  # Repetición de la partida actual
+                        if self.replay_record is None:
+                            self.start_replay(self.history)
+                        else:
+                            self.stop_replay()
+                        self.scheduler.request_frame()
+                    elif event.key == pygame.K_l:  # Cargar partidas guardadas
+                        self.load_archive()
+                        self.scheduler.request_frame()
+                    elif event.key == pygame.K_g:  # Guardar la partida actual
+                        self.save_current_game()
+                    elif self.replay_record is not None:
+                        self.handle_replay_key(event.key)
+                        self.scheduler.request_frame()
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.scheduler.request_frame()
+
+            if running and self.scheduler.should_render():
+                self.draw_board()
+                pygame.display.flip()
+                self.scheduler.frame_done()
 
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
-    game = OthelloGame()
+    game = OthelloGame(headless=headless_requested())
     game.run()
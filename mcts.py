@@ -0,0 +1,195 @@
+# mcts.py
+# Motor alternativo: Monte Carlo Tree Search (UCT) con la misma interfaz que OthelloAI
+import math
+import random
+import time
+
+import bitboard
+from ia_cliente import SearchStats, move_time_budget
+
+PASS = None  # Movimiento de un nodo en el que se pasa turno
+
+
+class MCTSNode:
+    __slots__ = ('geometry', 'black', 'white', 'player', 'parent', 'move', 'children', 'untried', 'visits',
+                 'wins')
+
+    def __init__(self, geometry, black, white, player, parent=None, move=None):
+        self.geometry = geometry
+        self.black = black
+        self.white = white
+        self.player = player  # Jugador al turno en este nodo
+        self.parent = parent
+        self.move = move      # Movimiento (índice de casilla o PASS) que llevó hasta aquí
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0       # Victorias del jugador que hizo `move`
+        own, opp = (black, white) if player == 1 else (white, black)
+        moves = geometry.legal_moves(own, opp)
+        if moves:
+            self.untried = list(bitboard.iter_bits(moves))
+        elif geometry.legal_moves(opp, own):
+            self.untried = [PASS]
+        else:
+            self.untried = []  # Fin de partida
+
+    def is_terminal(self):
+        return not self.untried and not self.children
+
+    def child_after(self, move):
+        own, opp = (self.black, self.white) if self.player == 1 else (self.white, self.black)
+        if move is not PASS:
+            own, opp = self.geometry.play(own, opp, move)
+        black, white = (own, opp) if self.player == 1 else (opp, own)
+        child = MCTSNode(self.geometry, black, white, 3 - self.player, self, move)
+        self.children.append(child)
+        return child
+
+    def select_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda c: c.wins / c.visits + exploration * math.sqrt(log_visits / c.visits))
+
+
+class MCTSAI:
+    """Motor UCT: anytime con presupuesto de tiempo y árbol conservado entre jugadas."""
+
+    def __init__(self, board_size=8, time_limit=1.0, max_iterations=None, exploration=1.4,
+                 playout='random', seed=None, verbose=True):
+        self.board_size = board_size
+        self.geometry = bitboard.geometry(board_size)
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.exploration = exploration
+        self.playout = playout  # 'random' o 'heuristic' (esquinas primero)
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.PLAYER_COLOR = 1
+        self.OPPONENT_COLOR = 2
+        self.root = None
+        self.last_stats = None
+
+    def set_player_color(self, color):
+        self.PLAYER_COLOR = color
+        self.OPPONENT_COLOR = 3 - color
+
+    # --- Reutilización del árbol ---
+
+    def _find_root(self, black, white):
+        """Busca la posición actual entre los nietos de la raíz anterior (nuestra jugada + la del rival)."""
+        if self.root is None:
+            return None
+        frontier = [self.root]
+        for _ in range(3):
+            for node in frontier:
+                if node.black == black and node.white == white and node.player == self.PLAYER_COLOR:
+                    node.parent = None
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+        return None
+
+    # --- Simulación ---
+
+    def _playout(self, black, white, player):
+        """Juega hasta el final y devuelve el ganador (0 = empate)."""
+        rng = self.rng
+        geometry = self.geometry
+        corners = geometry.corners  # Las prefieren las simulaciones "heuristic"
+        passes = 0
+        while passes < 2:
+            own, opp = (black, white) if player == 1 else (white, black)
+            moves = geometry.legal_moves(own, opp)
+            if not moves:
+                passes += 1
+                player = 3 - player
+                continue
+            passes = 0
+            if self.playout == 'heuristic' and moves & corners:
+                moves &= corners
+            choices = list(bitboard.iter_bits(moves))
+            own, opp = geometry.play(own, opp, rng.choice(choices))
+            black, white = (own, opp) if player == 1 else (opp, own)
+            player = 3 - player
+        black_count, white_count = black.bit_count(), white.bit_count()
+        if black_count == white_count:
+            return 0
+        return 1 if black_count > white_count else 2
+
+    def _iterate(self, stats):
+        node = self.root
+        depth = 0
+        # 1. Selección
+        while not node.untried and node.children:
+            node = node.select_child(self.exploration)
+            depth += 1
+        # 2. Expansión
+        if node.untried:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            node = node.child_after(move)
+            depth += 1
+        stats.depth = max(stats.depth, depth)
+        # 3. Simulación
+        winner = self._playout(node.black, node.white, node.player)
+        stats.leaves += 1
+        # 4. Retropropagación
+        while node is not None:
+            node.visits += 1
+            mover = 3 - node.player
+            if winner == 0:
+                node.wins += 0.5
+            elif winner == mover:
+                node.wins += 1
+            node = node.parent
+
+    def get_best_move(self, current_board_list, stats=None, time_left=None, increment=0.0):
+        """Busca durante time_limit segundos (o max_iterations) y devuelve (fila, columna).
+
+        Con `time_left` (reloj del servidor) el tiempo de la jugada se reparte
+        entre las jugadas restantes en lugar de usar time_limit.
+        """
+        black, white = self.geometry.from_board(current_board_list)
+        stats = stats if stats is not None else SearchStats()
+        start_time = time.time()
+        time_limit = self.time_limit
+        if time_left is not None:
+            empties = self.geometry.squares - (black | white).bit_count()
+            time_limit = move_time_budget(time_left, increment, empties)
+
+        reused = self._find_root(black, white)
+        self.root = reused or MCTSNode(self.geometry, black, white, self.PLAYER_COLOR)
+        if self.verbose:
+            status = f"árbol reutilizado ({self.root.visits} visitas)" if reused else "árbol nuevo"
+            print(f"🌲 MCTS pensando... ({time_limit:.2f}s, {status})")
+
+        if self.root.is_terminal() or self.root.untried == [PASS]:
+            self.last_stats = stats
+            return None
+
+        deadline = start_time + time_limit
+        iterations = 0
+        while True:
+            self._iterate(stats)
+            iterations += 1
+            if self.max_iterations and iterations >= self.max_iterations:
+                break
+            if time.time() >= deadline:
+                break
+
+        best = max(self.root.children, key=lambda c: c.visits)
+        best_move = self.geometry.to_move(best.move)
+
+        stats.nodes = iterations
+        stats.time = time.time() - start_time
+        stats.best_move = best_move
+        stats.score = best.wins / best.visits
+        # Variante principal: el hijo más visitado en cada nivel
+        node, pv = best, []
+        while node is not None:
+            pv.append(None if node.move is PASS else self.geometry.to_move(node.move))
+            node = max(node.children, key=lambda c: c.visits) if node.children else None
+        stats.principal_variation = pv
+        self.last_stats = stats
+
+        if self.verbose:
+            print(f"✅ MCTS: {iterations} simulaciones en {stats.time:.2f}s. "
+                  f"Victoria estimada: {stats.score:.1%}. Movimiento: {best_move}")
+        return best_move
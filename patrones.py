@@ -0,0 +1,121 @@
+# patrones.py
+# Evaluación por tablas de patrones (bordes, filas, diagonales y esquinas 3x3)
+#
+# Cada patrón es una lista de casillas; su configuración se codifica en base 3
+# (0 vacía, 1 negra, 2 blanca) y se usa como índice en una tabla con la
+# puntuación aprendida para las negras. Las cuatro rotaciones de un patrón
+# comparten tabla. Hay una tabla por fase de la partida (según el número de
+# fichas), ajustadas con `entrenamiento.py ajustar --model patrones`.
+#
+# Los índices se mantienen incrementalmente: al jugar solo cambian los
+# patrones que pasan por la casilla jugada y por las fichas volteadas, y al
+# deshacer se resta el mismo incremento. Evaluar es una suma de ~40 lecturas.
+import numpy as np
+
+import bitboard
+
+PATTERNS_FILE = 'patrones.npz'
+SIZE = 8
+
+# Patrón base (una de sus rotaciones), como (fila, columna)
+BASE_PATTERNS = {
+    'borde': [(0, c) for c in range(8)],
+    'fila2': [(1, c) for c in range(8)],
+    'fila3': [(2, c) for c in range(8)],
+    'fila4': [(3, c) for c in range(8)],
+    'diag8': [(i, i) for i in range(8)],
+    'diag7': [(i, i + 1) for i in range(7)],
+    'diag6': [(i, i + 2) for i in range(6)],
+    'diag5': [(i, i + 3) for i in range(5)],
+    'diag4': [(i, i + 4) for i in range(4)],
+    'esquina': [(r, c) for r in range(3) for c in range(3)],
+}
+
+# Fases de la partida por número de fichas en el tablero
+STAGES = 4
+
+
+def stage_of(discs):
+    return min((discs - 4) * STAGES // (SIZE * SIZE - 3), STAGES - 1)
+
+
+def _rotations(squares):
+    """Las 4 rotaciones de un patrón, sin repetir las que cubren las mismas casillas."""
+    instances, seen = [], set()
+    for _ in range(4):
+        key = frozenset(squares)
+        if key not in seen:
+            seen.add(key)
+            instances.append(squares)
+        squares = [(c, SIZE - 1 - r) for r, c in squares]
+    return instances
+
+
+def _build():
+    names, lengths, instances = [], [], []
+    for name, squares in BASE_PATTERNS.items():
+        names.append(name)
+        lengths.append(len(squares))
+        instances.extend((len(names) - 1, rotated) for rotated in _rotations(squares))
+
+    table_offsets = np.concatenate([[0], np.cumsum([3 ** n for n in lengths])])
+    # INDEX_MATRIX[casilla, instancia] = 3^k si la casilla es la k-ésima del patrón
+    index_matrix = np.zeros((SIZE * SIZE, len(instances)), dtype=np.int64)
+    offsets = np.zeros(len(instances), dtype=np.int64)
+    for i, (pattern, squares) in enumerate(instances):
+        offsets[i] = table_offsets[pattern]
+        for k, (r, c) in enumerate(squares):
+            index_matrix[r * SIZE + c, i] = 3 ** k
+    return names, index_matrix, offsets, int(table_offsets[-1])
+
+
+PATTERN_NAMES, INDEX_MATRIX, INSTANCE_OFFSETS, TABLE_SIZE = _build()
+NUM_INSTANCES = len(INSTANCE_OFFSETS)
+
+
+def board_features(boards):
+    """Índices globales de tabla de cada instancia (n, NUM_INSTANCES) y fase (n,) de varios tableros."""
+    flat = np.asarray(boards).reshape(len(boards), -1).astype(np.int64)
+    features = flat @ INDEX_MATRIX + INSTANCE_OFFSETS
+    stages = np.array([stage_of(d) for d in np.count_nonzero(flat, axis=1)], dtype=np.int64)
+    return features, stages
+
+
+class PatternEvaluator:
+    """Índices de patrones de la posición de búsqueda, actualizados con make/unmake."""
+
+    def __init__(self, tables):
+        self.tables = np.asarray(tables, dtype=np.float64)  # (STAGES, TABLE_SIZE)
+        self.indices = np.zeros(NUM_INSTANCES, dtype=np.int64)
+        self.discs = 4
+        self.undo = []
+
+    @classmethod
+    def load(cls, path=PATTERNS_FILE):
+        with np.load(path) as data:
+            return cls(data['tables'])
+
+    def set_board(self, board):
+        flat = np.asarray(board).reshape(-1).astype(np.int64)
+        self.indices = flat @ INDEX_MATRIX + INSTANCE_OFFSETS
+        self.discs = int(np.count_nonzero(flat))
+        self.undo = []
+
+    def make(self, index, player, flipped):
+        """Ficha de `player` en la casilla `index` y volteo de las casillas del bitboard `flipped`."""
+        delta = player * INDEX_MATRIX[index]
+        if flipped:
+            # Cada ficha volteada pasa de 3 - player a player: el dígito cambia en 2 * player - 3
+            squares = list(bitboard.iter_bits(flipped))
+            delta = delta + (2 * player - 3) * INDEX_MATRIX[squares].sum(axis=0)
+        self.indices += delta
+        self.discs += 1
+        self.undo.append(delta)
+
+    def unmake(self):
+        self.indices -= self.undo.pop()
+        self.discs -= 1
+
+    def score(self):
+        """Puntuación para las negras (en fichas de diferencia final esperada)."""
+        return float(self.tables[stage_of(self.discs), self.indices].sum())
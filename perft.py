@@ -0,0 +1,250 @@
+# perft.py
+# Perft: recuento de nodos hoja hasta profundidad N para validar y medir los generadores de movimientos
+#
+# Uso:
+#   python perft.py --depth 5
+#   python perft.py --depth 4 --backends servidor,ia --positions inicio,medio
+#
+# Convenciones: un pase cuenta como una jugada (el nodo tiene un único hijo)
+# y una posición de fin de partida cuenta como una hoja aunque quede
+# profundidad. Antes de la jugada 9 no puede haber pases, así que los
+# valores de la posición inicial coinciden con los de referencia publicados.
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+
+import bitboard
+import reglas
+
+# Valores de referencia desde la posición inicial
+START_PERFT = [1, 4, 12, 56, 244, 1396, 8200, 55092, 390216]
+
+# Posiciones fijas (jugadas en notación algebraica desde la posición inicial)
+# con sus recuentos de referencia por profundidad
+POSITIONS = {
+    'inicio': ('', START_PERFT),
+    'apertura': ('c4c5b6d3c2a7d6e7d7e3b5d2', [1, 9, 81, 747, 7328, 70583]),
+    'medio': ('d3c3b3e3f3c5f6g2b5c6f4a5h1f5d6e7d7e6d8c4', [1, 10, 121, 1167, 16004, 164708]),
+    'medio2': ('c4c5f6c3b5g7e3e6c2f3g3a5h8b3f4f2b4f5f7h3a3d2e2e1a6e7d7c1c6g8', [1, 11, 144, 1602, 20799, 239422]),
+    'final': ('c4e3f2c5d6e2f3g1d1g3e6c3b6e1b2a7g4f4h2f7d2h3b4c1g8e7f8a5a4b3c2d3h4d7c7e8f5a2b5d8c6h8g2g5',
+              [1, 12, 69, 724, 3383, 30693]),
+}
+
+
+def parse_moves(moves):
+    return [(int(moves[i + 1]) - 1, 'abcdefgh'.index(moves[i])) for i in range(0, len(moves), 2)]
+
+
+def position_from_moves(moves):
+    """Reproduce la secuencia de jugadas y devuelve (tablero, jugador al turno)."""
+    board = reglas.initial_board().astype(int)
+    player = 1
+    for move in parse_moves(moves):
+        boards, players, _ = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+        board, player = boards[0], int(players[0])
+    return board, player
+
+
+# --- Backends: adaptadores a (legal_moves, play) sobre las implementaciones existentes ---
+
+class OthelloGameBackend:
+    name = 'juego01'
+
+    def __init__(self):
+        from juego01 import OthelloGame
+        self.game = OthelloGame(headless=True)
+
+    def legal_moves(self, board, player):
+        self.game.board = board
+        self.game.current_player = player
+        return self.game.get_valid_moves()
+
+    def play(self, board, player, move):
+        self.game.board = board.copy()
+        self.game.current_player = player
+        self.game.valid_moves = [move]
+        self.game.game_over = False
+        self.game.make_move(*move)
+        return self.game.board
+
+
+class GameServerBackend:
+    name = 'servidor'
+
+    def __init__(self):
+        from servidor import GameRoom
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.room = GameRoom('perft')
+
+    def legal_moves(self, board, player):
+        self.room.board = board
+        return self.room.get_valid_moves(player)
+
+    def play(self, board, player, move):
+        self.room.board = board.copy()
+        self.room.current_player = player
+        self.room.game_over = False
+        self.room.make_move(move[0], move[1], player)
+        return self.room.board
+
+
+class OthelloAIBackend:
+    name = 'ia'
+
+    def __init__(self):
+        from ia_cliente import OthelloAI
+        self.ai = OthelloAI(verbose=False)
+
+    def legal_moves(self, board, player):
+        return self.ai._get_valid_moves(board, player)
+
+    def play(self, board, player, move):
+        return self.ai._make_move(board, move[0], move[1], player)
+
+
+class ReglasBackend:
+    name = 'reglas'
+
+    def legal_moves(self, board, player):
+        return reglas.legal_move_list(board, player)
+
+    def play(self, board, player, move):
+        return reglas.apply_moves_batch(board[np.newaxis], player, np.array([move]))[0]
+
+
+def perft_bitboard(own, opp, depth):
+    """Perft sobre bitboards de 64 bits (own = jugador al turno)."""
+    if depth == 0:
+        return 1
+    moves = bitboard.legal_moves(own, opp)
+    if not moves:
+        if not bitboard.legal_moves(opp, own):
+            return 1  # Fin de partida
+        return perft_bitboard(opp, own, depth - 1)  # Pase
+    if depth == 1:
+        return moves.bit_count()
+    total = 0
+    for index in bitboard.iter_bits(moves):
+        new_own, new_opp = bitboard.play(own, opp, index)
+        total += perft_bitboard(new_opp, new_own, depth - 1)
+    return total
+
+
+def perft(backend, board, player, depth):
+    """Perft recursivo nodo a nodo (con recuento directo en el último nivel)."""
+    if depth == 0:
+        return 1
+    moves = backend.legal_moves(board, player)
+    if not moves:
+        if not backend.legal_moves(board, 3 - player):
+            return 1  # Fin de partida
+        return perft(backend, board, 3 - player, depth - 1)  # Pase
+    if depth == 1:
+        return len(moves)
+    return sum(perft(backend, backend.play(board, player, move), 3 - player, depth - 1) for move in moves)
+
+
+def perft_batch(board, player, depth):
+    """Perft por niveles con reglas.py: cada nivel se expande en una sola llamada vectorizada."""
+    boards = np.asarray(board)[np.newaxis]
+    players = np.array([player])
+    leaves = 0
+    for remaining in range(depth, 0, -1):
+        legal = reglas.legal_moves_batch(boards, players)
+        counts = legal.reshape(len(boards), -1).sum(axis=1)
+
+        stuck = counts == 0
+        if stuck.any():
+            opponent_can_move = reglas.legal_moves_batch(boards[stuck], 3 - players[stuck])
+            opponent_can_move = opponent_can_move.reshape(int(stuck.sum()), -1).any(axis=1)
+            leaves += int(np.sum(~opponent_can_move))  # Fin de partida
+            passing = np.nonzero(stuck)[0][opponent_can_move]
+        else:
+            passing = np.zeros(0, dtype=int)
+
+        if remaining == 1:
+            return leaves + int(counts.sum()) + len(passing)
+
+        # Expandir todos los (tablero, movimiento) del nivel a la vez
+        parent, rows, cols = np.nonzero(legal)
+        children = reglas.apply_moves_batch(boards[parent], players[parent], np.stack([rows, cols], axis=1))
+        boards = np.concatenate([children, boards[passing]])
+        players = np.concatenate([3 - players[parent], 3 - players[passing]])
+    return leaves + len(boards)
+
+
+class BatchBackend:
+    """Backend por lotes: se mide con perft_batch en lugar de legal_moves/play."""
+    name = 'lote'
+
+
+class BitboardBackend:
+    """Backend de bitboards: se mide con perft_bitboard."""
+    name = 'bitboard'
+
+
+BACKENDS = {
+    'juego01': OthelloGameBackend,
+    'servidor': GameServerBackend,
+    'ia': OthelloAIBackend,
+    'reglas': ReglasBackend,
+    'lote': BatchBackend,
+    'bitboard': BitboardBackend,
+}
+
+
+def run_perft(backend, board, player, depth):
+    if isinstance(backend, BatchBackend):
+        return perft_batch(board, player, depth)
+    if isinstance(backend, BitboardBackend):
+        black, white = bitboard.from_board(board)
+        own, opp = (black, white) if player == 1 else (white, black)
+        return perft_bitboard(own, opp, depth)
+    return perft(backend, board, player, depth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft para los generadores de movimientos")
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--positions', default=','.join(POSITIONS))
+    args = parser.parse_args()
+
+    print("=== 🧮 PERFT OTHELLO ===")
+    failures = 0
+    for backend_name in args.backends.split(','):
+        backend = BACKENDS[backend_name]()
+        total_nodes = 0
+        total_time = 0.0
+        for position_name in args.positions.split(','):
+            moves, reference = POSITIONS[position_name]
+            board, player = position_from_moves(moves)
+            depth = min(args.depth, len(reference) - 1)
+
+            start_time = time.perf_counter()
+            nodes = run_perft(backend, board, player, depth)
+            elapsed = time.perf_counter() - start_time
+            total_nodes += nodes
+            total_time += elapsed
+
+            ok = nodes == reference[depth]
+            failures += not ok
+            status = "✅" if ok else f"❌ (esperado {reference[depth]})"
+            print(f"{backend_name:>9} {position_name:>9} d={depth}: {nodes:>9} nodos {elapsed:7.3f}s {status}")
+        print(f"⚡ {backend_name}: {total_nodes / max(total_time, 1e-9):,.0f} nodos/s")
+
+    if failures:
+        print(f"❌ {failures} recuentos no coinciden con la referencia")
+        sys.exit(1)
+    print("✅ Todos los recuentos coinciden")
+
+
+if __name__ == "__main__":
+    main()
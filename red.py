@@ -0,0 +1,165 @@
+# red.py
+# Conexión de cliente no bloqueante basada en selectors
+import json
+import selectors
+import socket
+import threading
+
+# Tiempo máximo que close() espera a que se escriban los envíos pendientes
+CLOSE_FLUSH_TIMEOUT = 1.0
+
+
+class SelectorConnection:
+    """Conexión TCP con el servidor dirigida por un selector.
+
+    Un único hilo de E/S se bloquea en selector.select() sin timeout (no hay
+    sondeo): lee lo que llegue, separa los mensajes JSON por líneas y los
+    entrega a `on_message`. Este hilo nunca toca el estado del juego; el
+    cliente decide en `on_message` cómo pasar el mensaje a su bucle
+    principal. Los envíos se encolan y se vacían cuando el socket admite
+    escritura. Para despertar al selector (envíos, cierre) se usa un
+    socketpair. Al cerrar se vacían antes los envíos pendientes.
+    """
+
+    def __init__(self, on_message, on_close=None):
+        self.on_message = on_message
+        self.on_close = on_close
+        self.socket = None
+        self.selector = None
+        self.connected = False
+        self.closing = False  # close() pedido: se sale en cuanto se vacíe outbox
+        self.outbox = bytearray()
+        self.outbox_lock = threading.Lock()
+        self.wakeup_reader = None
+        self.wakeup_writer = None
+        self.extra_readers = {}
+        self.thread = None
+
+    def connect(self, host, port, timeout=10):
+        """Conexión bloqueante (con timeout) y arranque del hilo de E/S."""
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setblocking(False)
+        self.socket = sock
+
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.selector.register(sock, selectors.EVENT_READ)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ)
+        for fileobj, callback in self.extra_readers.items():
+            self.selector.register(fileobj, selectors.EVENT_READ, callback)
+
+        self.connected = True
+        self.closing = False
+        self.thread = threading.Thread(target=self._io_loop, name="SelectorConnection", daemon=True)
+        self.thread.start()
+
+    def add_reader(self, fileobj, callback):
+        """Vigila otro descriptor (p. ej. una Pipe) en el mismo selector."""
+        self.extra_readers[fileobj] = callback
+        if self.selector is not None:
+            self.selector.register(fileobj, selectors.EVENT_READ, callback)
+            self._wakeup()
+
+    def remove_reader(self, fileobj):
+        self.extra_readers.pop(fileobj, None)
+        if self.selector is not None:
+            try:
+                self.selector.unregister(fileobj)
+            except (KeyError, ValueError):
+                pass
+
+    def send(self, message):
+        """Encola un mensaje; el hilo de E/S lo escribe cuando el socket esté listo."""
+        if not self.connected or self.closing:
+            return False
+        data = (json.dumps(message) + '\n').encode('utf-8')
+        with self.outbox_lock:
+            self.outbox += data
+        self._wakeup()
+        return True
+
+    def close(self, flush_timeout=CLOSE_FLUSH_TIMEOUT):
+        """Cierra la conexión tras escribir lo pendiente (como mucho `flush_timeout` segundos)."""
+        if not self.connected:
+            return
+        self.closing = True
+        self._wakeup()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=flush_timeout)
+            if self.thread.is_alive():
+                # El servidor no acepta más datos: se descarta lo que quede
+                self.connected = False
+                self._wakeup()
+                self.thread.join(timeout=1)
+
+    def _wakeup(self):
+        try:
+            self.wakeup_writer.send(b'\0')
+        except (AttributeError, OSError):
+            pass
+
+    def _io_loop(self):
+        buffer = b""
+        closed_by_peer = False
+        try:
+            while self.connected:
+                with self.outbox_lock:
+                    want_write = bool(self.outbox)
+                if self.closing and not want_write:
+                    break
+                events = selectors.EVENT_READ | (selectors.EVENT_WRITE if want_write else 0)
+                self.selector.modify(self.socket, events)
+
+                for key, mask in self.selector.select():
+                    if key.fileobj is self.wakeup_reader:
+                        try:
+                            self.wakeup_reader.recv(4096)
+                        except BlockingIOError:
+                            pass
+                    elif key.fileobj is self.socket:
+                        if mask & selectors.EVENT_WRITE:
+                            self._flush()
+                        if mask & selectors.EVENT_READ:
+                            try:
+                                data = self.socket.recv(65536)
+                            except BlockingIOError:
+                                continue
+                            if not data:
+                                print("📭 Servidor cerró la conexión")
+                                closed_by_peer = True
+                                self.connected = False
+                                break
+                            buffer += data
+                            while b'\n' in buffer:
+                                message_bytes, buffer = buffer.split(b'\n', 1)
+                                if message_bytes.strip():
+                                    try:
+                                        self.on_message(json.loads(message_bytes))
+                                    except json.JSONDecodeError as e:
+                                        print(f"❌ Error decodificando JSON: {e}")
+                    else:
+                        key.data(key.fileobj)
+        except Exception as e:
+            print(f"❌ Error en la conexión: {e}")
+            closed_by_peer = True
+        finally:
+            self.connected = False
+            self.selector.close()
+            for sock in (self.socket, self.wakeup_reader, self.wakeup_writer):
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+            if self.on_close:
+                self.on_close(closed_by_peer)
+
+    def _flush(self):
+        with self.outbox_lock:
+            if not self.outbox:
+                return
+            try:
+                sent = self.socket.send(self.outbox)
+            except BlockingIOError:
+                return
+            del self.outbox[:sent]
@@ -0,0 +1,152 @@
+# reglas.py
+# Reglas de Othello vectorizadas sobre lotes de tableros (N, 8, 8)
+#
+# Los tableros usan la misma codificación que el resto del proyecto
+# (0 = vacío, 1 = negro, 2 = blanco). Todas las operaciones se hacen con
+# desplazamientos de arrays booleanos, sin bucles por casilla, de modo que
+# el coste por llamada apenas depende del número de tableros del lote.
+import numpy as np
+
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+PASS = -1  # Fila/columna usada para indicar "pasar turno"
+
+
+def initial_board(board_size=8):
+    board = np.zeros((board_size, board_size), dtype=np.int8)
+    mid = board_size // 2
+    board[mid - 1][mid - 1] = 2
+    board[mid][mid] = 2
+    board[mid - 1][mid] = 1
+    board[mid][mid - 1] = 1
+    return board
+
+
+def initial_boards(n, board_size=8):
+    return np.repeat(initial_board(board_size)[np.newaxis], n, axis=0)
+
+
+def shift(masks, dr, dc):
+    """Desplaza un lote de máscaras (N, S, S) una casilla en la dirección (dr, dc).
+
+    shifted[:, r + dr, c + dc] = masks[:, r, c]; lo que sale del tablero se pierde.
+    """
+    size = masks.shape[-1]
+    shifted = np.zeros_like(masks)
+    src_r = slice(max(0, -dr), size - max(0, dr))
+    dst_r = slice(max(0, dr), size - max(0, -dr))
+    src_c = slice(max(0, -dc), size - max(0, dc))
+    dst_c = slice(max(0, dc), size - max(0, -dc))
+    shifted[:, dst_r, dst_c] = masks[:, src_r, src_c]
+    return shifted
+
+
+def _player_masks(boards, players):
+    boards = np.asarray(boards)
+    players = np.broadcast_to(np.asarray(players), boards.shape[:1]).reshape(-1, 1, 1)
+    own = boards == players
+    opp = boards == (3 - players)
+    return own, opp
+
+
+def legal_moves_batch(boards, players):
+    """Máscara booleana (N, S, S) de movimientos legales para `players` (escalar o (N,))."""
+    boards = np.asarray(boards)
+    own, opp = _player_masks(boards, players)
+    empty = boards == 0
+    size = boards.shape[-1]
+
+    legal = np.zeros_like(own)
+    for dr, dc in DIRECTIONS:
+        # Cadena de fichas rivales contiguas partiendo de una ficha propia
+        chain = shift(own, dr, dc) & opp
+        for _ in range(size - 3):
+            chain |= shift(chain, dr, dc) & opp
+        legal |= shift(chain, dr, dc) & empty
+    return legal
+
+
+def apply_moves_batch(boards, players, moves):
+    """Aplica un movimiento por tablero y devuelve los nuevos tableros.
+
+    `moves` es un array (N, 2) de (fila, columna); las filas con PASS dejan
+    el tablero intacto. Los movimientos deben ser legales (no se comprueba).
+    """
+    boards = np.asarray(boards)
+    moves = np.asarray(moves).reshape(-1, 2)
+    own, opp = _player_masks(boards, players)
+    size = boards.shape[-1]
+    n = boards.shape[0]
+
+    played = moves[:, 0] != PASS
+    placed = np.zeros_like(own)
+    index = np.nonzero(played)[0]
+    placed[index, moves[index, 0], moves[index, 1]] = True
+
+    flips = np.zeros_like(own)
+    for dr, dc in DIRECTIONS:
+        # Fichas rivales contiguas desde la casilla jugada...
+        line = shift(placed, dr, dc) & opp
+        for _ in range(size - 3):
+            line |= shift(line, dr, dc) & opp
+        # ...que solo se voltean si la cadena termina en una ficha propia
+        bracketed = (shift(line, dr, dc) & own).reshape(n, -1).any(axis=1)
+        flips |= line & bracketed[:, np.newaxis, np.newaxis]
+
+    new_boards = boards.copy()
+    player_grid = np.broadcast_to(np.asarray(players), (n,)).reshape(-1, 1, 1)
+    new_boards[:] = np.where(placed | flips, player_grid, boards)
+    return new_boards
+
+
+def disc_counts_batch(boards):
+    """Número de fichas (negras, blancas) por tablero, como array (N, 2)."""
+    boards = np.asarray(boards)
+    flat = boards.reshape(boards.shape[0], -1)
+    return np.stack([(flat == 1).sum(axis=1), (flat == 2).sum(axis=1)], axis=1)
+
+
+def advance_batch(boards, players, moves):
+    """Aplica los movimientos y resuelve los turnos siguientes, incluidos los pases.
+
+    Devuelve (nuevos_tableros, siguiente_jugador, juego_terminado).
+    """
+    new_boards = apply_moves_batch(boards, players, moves)
+    players = np.broadcast_to(np.asarray(players), new_boards.shape[:1])
+    next_players = 3 - players
+
+    has_moves = legal_moves_batch(new_boards, next_players).reshape(len(new_boards), -1).any(axis=1)
+    # Si el rival no puede mover, repite el mismo jugador (si puede)
+    next_players = np.where(has_moves, next_players, players)
+    can_repeat = legal_moves_batch(new_boards, players).reshape(len(new_boards), -1).any(axis=1)
+    game_over = ~has_moves & ~can_repeat
+    return new_boards, next_players, game_over
+
+
+def legal_move_list(board, player):
+    """Lista de movimientos legales (fila, columna) de un único tablero."""
+    mask = legal_moves_batch(np.asarray(board)[np.newaxis], player)[0]
+    return [(int(row), int(col)) for row, col in zip(*np.nonzero(mask))]
+
+
+def boards_to_bitboards(boards):
+    """Codifica un lote de tableros 8x8 como dos arrays uint64 (negras, blancas).
+
+    El bit `fila * 8 + columna` está activo si la casilla tiene una ficha de ese color.
+    """
+    boards = np.asarray(boards)
+    flat = boards.reshape(boards.shape[0], -1)
+    powers = np.left_shift(np.uint64(1), np.arange(flat.shape[1], dtype=np.uint64))
+    black = np.bitwise_or.reduce(np.where(flat == 1, powers, np.uint64(0)), axis=1)
+    white = np.bitwise_or.reduce(np.where(flat == 2, powers, np.uint64(0)), axis=1)
+    return black, white
+
+
+def bitboards_to_boards(black, white, board_size=8):
+    """Inversa de boards_to_bitboards."""
+    black = np.asarray(black, dtype=np.uint64)[:, np.newaxis]
+    white = np.asarray(white, dtype=np.uint64)[:, np.newaxis]
+    bits = np.arange(board_size * board_size, dtype=np.uint64)
+    boards = ((black >> bits) & np.uint64(1)).astype(np.int8)
+    boards += 2 * ((white >> bits) & np.uint64(1)).astype(np.int8)
+    return boards.reshape(-1, board_size, board_size)
@@ -0,0 +1,103 @@
+# renderizado.py
+# Utilidades de renderizado compartidas por los clientes PyGame
+import os
+import sys
+from collections import OrderedDict
+
+import pygame
+
+# Variable de entorno equivalente a pasar --headless por línea de comandos
+HEADLESS_ENV = 'OTHELLO_HEADLESS'
+
+
+def headless_requested(argv=None):
+    argv = sys.argv if argv is None else argv
+    return '--headless' in argv or os.environ.get(HEADLESS_ENV) == '1'
+
+
+def init_pygame(headless=False):
+    """Inicializa PyGame.
+
+    En modo headless se usan los drivers dummy de SDL (sin ventana ni audio)
+    y solo se inicializan los módulos de vídeo y fuentes: el mixer es el más
+    lento en arrancar y no se usa.
+    """
+    if headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        pygame.display.init()
+        pygame.font.init()
+    else:
+        pygame.init()
+
+
+def load_logo(headless=False):
+    """Carga el logo; en modo headless se sustituye por una superficie vacía."""
+    if headless:
+        return pygame.Surface((80, 80), pygame.SRCALPHA)
+    logo = pygame.image.load("intro.png")
+    return pygame.transform.scale(logo, (80, 80))
+
+
+class TextCache:
+    """Caché de superficies de texto indexada por (texto, fuente, color).
+
+    Las fuentes se resuelven una sola vez al arrancar y se pasan ya
+    construidas; aquí solo se evita volver a renderizar el mismo texto.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (text, font, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)  # Descartar la entrada menos usada
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+class FrameScheduler:
+    """Planificador de frames: solo se renderiza cuando hay algo nuevo que mostrar.
+
+    Entre frames el bucle principal se bloquea en pygame.event.wait(), así un
+    cliente que espera al oponente no consume CPU. Los frames pedidos seguidos
+    se limitan a `fps`.
+    """
+
+    def __init__(self, fps=60):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.dirty = True
+
+    def request_frame(self):
+        self.dirty = True
+
+    def should_render(self):
+        return self.dirty
+
+    def wait_events(self):
+        """Devuelve los eventos pendientes; bloquea si no hay ningún frame pendiente."""
+        if self.should_render():
+            return pygame.event.get()
+        events = [pygame.event.wait()]
+        events.extend(pygame.event.get())
+        return events
+
+    def frame_done(self):
+        self.dirty = False
+        self.clock.tick(self.fps)
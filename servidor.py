@@ -1,4 +1,3 @@
-
 import socket
 import threading
 import json
@@ -6,21 +5,58 @@ import numpy as np
 import time
 import traceback
 
+import bitboard
 
-class GameServer:
-    def __init__(self, host='127.0.0.1', port=5555):
-        self.host = host
-        self.port = port
-        self.server_socket = None
-        self.clients = []
-        self.client_info = []
-        self.running = False
+# Tamaños de tablero admitidos (pares, con las cuatro fichas centrales)
+BOARD_SIZES = (6, 8, 10, 12, 14, 16)
+
+# Sala a la que van los 'join' sin game_id
+DEFAULT_ROOM = 'default'
+
+
+def encode_message(message):
+    """Mensaje -> línea JSON en bytes. Los mensajes solo llevan tipos nativos de Python."""
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def parse_time_control(text):
+    """'5+3' -> (300.0, 3.0): minutos iniciales + segundos de incremento por jugada."""
+    minutes, _, increment = text.partition('+')
+    return float(minutes) * 60, float(increment or 0)
+
+
+class GameRoom:
+    """Una partida: tablero, turno y los dos asientos.
+
+    Todos los mensajes de la sala llevan su game_id, así una misma conexión
+    puede jugar en muchas salas a la vez.
+    """
+
+    def __init__(self, game_id, board_size=8, time_control=None):
+        self.game_id = game_id
+        self.board_size = board_size
+        self.geometry = bitboard.geometry(board_size)
+        self.time_control = time_control  # (segundos iniciales, incremento) o None sin reloj
+        self.players = {1: None, 2: None}  # color -> ClientConnection
         self.lock = threading.Lock()
+        self.flag_timer = None
         self.reset_game()
 
+    def free_color(self):
+        for color in (1, 2):
+            if self.players[color] is None:
+                return color
+        return None
+
+    def is_full(self):
+        return self.free_color() is None
+
+    def is_empty(self):
+        return all(player is None for player in self.players.values())
+
     def reset_game(self):
-        self.board = np.zeros((8, 8), dtype=int)
-        mid = 4
+        self.board = np.zeros((self.board_size, self.board_size), dtype=int)
+        mid = self.board_size // 2
         self.board[mid - 1][mid - 1] = 2
         self.board[mid][mid] = 2
         self.board[mid - 1][mid] = 1
@@ -28,63 +64,81 @@ class GameServer:
         self.current_player = 1
         self.game_over = False
         self.winner = None
-        print("🎮 Juego reiniciado")
+        self.end_reason = None
+        self.version = 0  # Sube con cada cambio de estado
+        # (versión, estado, {(tipo de mensaje, campos): bytes}): el estado se construye
+        # y se serializa una sola vez por versión, lo reciba quien lo reciba
+        self.state_cache = None
+        if self.time_control:
+            self.clocks = {1: self.time_control[0], 2: self.time_control[0]}
+        else:
+            self.clocks = None
+        self.turn_started = time.monotonic()
+        print(f"🎮 Juego reiniciado ({self.game_id})")
+
+    # --- Reloj ---
+
+    def time_left(self, player, now=None):
+        """Tiempo que le queda a `player`, descontando el turno en curso."""
+        remaining = self.clocks[player]
+        if player == self.current_player and not self.game_over:
+            remaining -= (now or time.monotonic()) - self.turn_started
+        return max(remaining, 0.0)
+
+    def check_flag(self):
+        """Termina la partida si al jugador al turno se le acabó el tiempo."""
+        if not self.clocks or self.game_over or self.time_left(self.current_player) > 0:
+            return False
+        self.clocks[self.current_player] = 0.0
+        self.game_over = True
+        self.winner = 3 - self.current_player
+        self.end_reason = 'time'
+        self.version += 1
+        return True
+
+    def bitboards(self, player):
+        """(propias, rivales) de `player` a partir del tablero actual."""
+        black, white = self.geometry.from_board(self.board)
+        return (black, white) if player == 1 else (white, black)
 
     def get_valid_moves(self, player=None):
         if player is None:
             player = self.current_player
-        valid_moves = []
-        for row in range(8):
-            for col in range(8):
-                if self.is_valid_move(row, col, player):
-                    valid_moves.append((row, col))
-        return valid_moves
+        own, opp = self.bitboards(player)
+        return self.geometry.move_list(self.geometry.legal_moves(own, opp))
 
     def is_valid_move(self, row, col, player):
-        if self.board[row][col] != 0:
+        if not (0 <= row < self.board_size and 0 <= col < self.board_size):
             return False
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        opponent = 3 - player
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            found_opponent = False
-            while 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == opponent:
-                found_opponent = True
-                r += dr
-                c += dc
-            if found_opponent and 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == player:
-                return True
-        return False
+        own, opp = self.bitboards(player)
+        return bool(self.geometry.legal_moves(own, opp) >> self.geometry.to_index(row, col) & 1)
 
     def make_move(self, row, col, player):
         if player != self.current_player:
             return False, "No es tu turno"
+        if self.check_flag():
+            return False, "Tiempo agotado"
         if not self.is_valid_move(row, col, player):
             return False, "Movimiento inválido"
 
-        self.board[row][col] = player
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        opponent = 3 - player
-        flipped = 0
-
-        for dr, dc in directions:
-            r, c = row + dr, col + dc
-            to_flip = []
-            while 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == opponent:
-                to_flip.append((r, c))
-                r += dr
-                c += dc
-            if 0 <= r < 8 and 0 <= c < 8 and self.board[r][c] == player:
-                for flip_row, flip_col in to_flip:
-                    self.board[flip_row][flip_col] = player
-                    flipped += 1
+        if self.clocks:
+            now = time.monotonic()
+            self.clocks[player] = self.time_left(player, now) + self.time_control[1]
+            self.turn_started = now
+
+        own, opp = self.bitboards(player)
+        own, opp = self.geometry.play(own, opp, self.geometry.to_index(row, col))
+        black, white = (own, opp) if player == 1 else (opp, own)
+        self.board = self.geometry.to_array(black, white).astype(int)
 
         self.current_player = 3 - self.current_player
         if not self.get_valid_moves():
             self.current_player = 3 - self.current_player
             if not self.get_valid_moves():
                 self.game_over = True
+                self.end_reason = 'board'
                 self.determine_winner()
+        self.version += 1
         return True, "Movimiento exitoso"
 
     def determine_winner(self):
@@ -98,223 +152,293 @@ class GameServer:
             self.winner = 0
 
     def get_game_state(self):
-        # CONVERTIR todos los valores numpy a tipos nativos de Python
-        board_list = self.board.tolist()
-        valid_moves = self.get_valid_moves()
-
-        # Asegurarse de que los scores sean int nativos, no int64
-        black_score = int(np.sum(self.board == 1))
-        white_score = int(np.sum(self.board == 2))
-
+        """Estado de la partida (solo tipos nativos); se reutiliza mientras no cambie la versión."""
+        if self.state_cache is None or self.state_cache[0] != self.version:
+            self.state_cache = (self.version, self._build_game_state(), {})
+        return self.state_cache[1]
+
+    def encoded_state(self, msg_type, **fields):
+        """Mensaje `msg_type` con el estado actual, ya serializado (una vez por versión, tipo y campos).
+
+        Los campos extra forman parte de la clave, así que deben ser hashables.
+        """
+        state = self.get_game_state()
+        encoded = self.state_cache[2]
+        key = (msg_type, tuple(sorted(fields.items())))
+        if key not in encoded:
+            encoded[key] = encode_message(dict(type=msg_type, game_state=state, game_id=self.game_id, **fields))
+        return encoded[key]
+
+    def _build_game_state(self):
+        # Todo sale de los bitboards como int/bool nativos: no hace falta convertir tipos de numpy
+        black, white = self.bitboards(1)
         return {
-            'board': board_list,
-            'current_player': int(self.current_player),  # Convertir a int nativo
-            'game_over': bool(self.game_over),  # Convertir a bool nativo
-            'winner': int(self.winner) if self.winner is not None else None,
-            'valid_moves': [(int(row), int(col)) for row, col in valid_moves],  # Convertir a int nativos
+            'game_id': self.game_id,
+            'board': self.geometry.to_board(black, white),
+            'board_size': self.board_size,
+            'current_player': self.current_player,
+            'game_over': self.game_over,
+            'winner': self.winner,
+            'valid_moves': self.get_valid_moves(),
             'scores': {
-                'black': black_score,
-                'white': white_score
-            }
+                'black': black.bit_count(),
+                'white': white.bit_count()
+            },
+            'end_reason': self.end_reason,
+            # Segundos restantes de cada jugador en el momento de enviar (None sin reloj)
+            'clocks': {
+                'black': round(self.time_left(1), 3),
+                'white': round(self.time_left(2), 3),
+                'increment': self.time_control[1]
+            } if self.clocks else None
         }
 
-    def send_to_client(self, client_socket, message):
+
+class ClientConnection:
+    """Socket de un cliente y los asientos que ocupa (game_id -> color)."""
+
+    def __init__(self, client_socket, address, client_id):
+        self.socket = client_socket
+        self.address = address
+        self.client_id = client_id
+        self.send_lock = threading.Lock()
+        self.rooms = {}
+
+
+class GameServer:
+    def __init__(self, host='127.0.0.1', port=5555, board_size=8, time_control=None):
+        if board_size not in BOARD_SIZES:
+            raise ValueError(f"Tamaño de tablero no admitido: {board_size}")
+        self.host = host
+        self.port = port
+        self.board_size = board_size
+        self.time_control = time_control
+        self.server_socket = None
+        self.connections = []
+        self.rooms = {}  # game_id -> GameRoom
+        self.next_client_id = 0
+        self.running = False
+        self.lock = threading.Lock()
+
+    def send_to_client(self, connection, message):
+        return self.send_encoded(connection, encode_message(message), message['type'])
+
+    def send_encoded(self, connection, data, msg_type):
+        """Envía un mensaje ya serializado."""
         try:
-            # Función personalizada para serializar tipos numpy
-            def numpy_serializer(obj):
-                if isinstance(obj, (np.integer, np.int64, np.int32)):
-                    return int(obj)
-                elif isinstance(obj, (np.floating, np.float64, np.float32)):
-                    return float(obj)
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                elif isinstance(obj, (np.bool_)):
-                    return bool(obj)
-                raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
-
-            message_str = json.dumps(message, default=numpy_serializer) + '\n'
-            client_socket.send(message_str.encode('utf-8'))
-            print(f"📤 Enviado a cliente: {message['type']}")
+            # Varias salas pueden escribir a la vez en la misma conexión
+            with connection.send_lock:
+                connection.socket.sendall(data)
+            print(f"📤 Enviado a cliente: {msg_type}")
             return True
         except Exception as e:
             print(f"❌ Error enviando mensaje: {e}")
             traceback.print_exc()
             return False
 
-    def broadcast_to_all(self, message):
-        with self.lock:
-            clients_to_remove = []
-            for i, client_socket in enumerate(self.clients):
-                if client_socket:
-                    if not self.send_to_client(client_socket, message):
-                        print(f"⚠️ Cliente {i} desconectado")
-                        clients_to_remove.append(i)
-
-            # Remover clientes desconectados
-            for i in sorted(clients_to_remove, reverse=True):
-                if i < len(self.clients):
-                    self.clients[i] = None
-                    self.client_info[i] = None
-
-    def start_game_if_ready(self):
-        """Inicia el juego si hay exactamente 2 jugadores conectados"""
+    def broadcast_to_room(self, room, message):
+        message['game_id'] = room.game_id
+        self.broadcast_encoded(room, encode_message(message), message['type'])
+
+    def broadcast_encoded(self, room, data, msg_type):
+        """Envía los mismos bytes a todos los jugadores de la sala (se serializa una sola vez)."""
+        for connection in list(room.players.values()):
+            if connection is not None:
+                self.send_encoded(connection, data, msg_type)
+
+    def find_open_room(self, connection):
+        """Primera sala por defecto con un asiento libre (se crean según hace falta)."""
+        number = 1
+        while True:
+            game_id = DEFAULT_ROOM if number == 1 else f"{DEFAULT_ROOM}-{number}"
+            room = self.rooms.get(game_id)
+            if room is None or (not room.is_full() and game_id not in connection.rooms):
+                return game_id
+            number += 1
+
+    def join_room(self, connection, game_id=None):
+        """Sienta a la conexión en una sala; sin game_id se busca una sala por defecto libre."""
         with self.lock:
-            active_clients = [c for c in self.clients if c is not None]
-
-        print(f"🔍 Verificando jugadores: {len(active_clients)}/2 conectados")
-
-        if len(active_clients) == 2:
-            print("🎉 ¡Ambos jugadores conectados! Iniciando juego...")
-
-            # Reiniciar el juego para empezar desde cero
-            self.reset_game()
+            if game_id is None:
+                game_id = self.find_open_room(connection)
+            room = self.rooms.get(game_id)
+            if room is None:
+                room = self.rooms[game_id] = GameRoom(game_id, self.board_size, self.time_control)
+            if game_id in connection.rooms or room.is_full():
+                error = 'Ya estás en esta sala' if game_id in connection.rooms else 'Sala completa'
+                color = None
+            else:
+                color = room.free_color()
+                room.players[color] = connection
+                connection.rooms[game_id] = color
+            seated = sum(1 for player in room.players.values() if player is not None)
+
+        if color is None:
+            self.send_to_client(connection, {'type': 'error', 'game_id': game_id, 'message': error})
+            return
+
+        print(f"✅ Cliente {connection.client_id} en la sala {game_id} como "
+              f"{'Negro' if color == 1 else 'Blanco'} ({seated}/2)")
+        welcome_msg = {
+            'type': 'welcome',
+            'game_id': game_id,
+            'player_color': color,
+            'message': f'Eres el jugador {"Negro" if color == 1 else "Blanco"}',
+            'client_id': connection.client_id
+        }
+        self.send_to_client(connection, welcome_msg)
 
-            game_state = self.get_game_state()
-            start_message = {
-                'type': 'game_start',
-                'game_state': game_state,
-                'message': '¡El juego ha comenzado!'
+        if seated == 2:
+            self.start_game(room)
+        else:
+            wait_msg = {
+                'type': 'waiting',
+                'game_id': game_id,
+                'message': f'Esperando oponente... ({seated}/2 jugadores)'
             }
+            self.send_to_client(connection, wait_msg)
+
+    def start_game(self, room):
+        """Empieza la partida de una sala en cuanto están los dos jugadores."""
+        print(f"🎉 ¡Ambos jugadores en la sala {room.game_id}! Iniciando juego...")
+        with room.lock:
+            room.reset_game()
+            start_message = room.encoded_state('game_start', message='¡El juego ha comenzado!')
+            self.schedule_flag(room)
+        self.broadcast_encoded(room, start_message, 'game_start')
+
+    def schedule_flag(self, room):
+        """Programa la caída de bandera del jugador al turno (llamar con room.lock)."""
+        if room.flag_timer:
+            room.flag_timer.cancel()
+            room.flag_timer = None
+        if not room.clocks or room.game_over:
+            return
+        room.flag_timer = threading.Timer(room.time_left(room.current_player) + 0.01,
+                                          self.flag_fall, args=(room, room.version))
+        room.flag_timer.daemon = True
+        room.flag_timer.start()
+
+    def flag_fall(self, room, version):
+        with room.lock:
+            if room.version != version or not room.check_flag():
+                return  # Se jugó a tiempo
+            update = room.encoded_state('game_update')
+        print(f"⏰ Sala {room.game_id}: tiempo agotado para {'Negro' if room.winner == 2 else 'Blanco'}")
+        self.broadcast_encoded(room, update, 'game_update')
+
+    def leave_rooms(self, connection):
+        """Libera los asientos de una conexión y avisa a sus rivales."""
+        with self.lock:
+            left = []
+            for game_id, color in connection.rooms.items():
+                room = self.rooms.get(game_id)
+                if room is None:
+                    continue
+                room.players[color] = None
+                if room.is_empty():
+                    if room.flag_timer:
+                        room.flag_timer.cancel()
+                    del self.rooms[game_id]
+                else:
+                    left.append(room)
+            connection.rooms = {}
+            if connection in self.connections:
+                self.connections.remove(connection)
+
+        disconnect_msg = {
+            'type': 'opponent_disconnected',
+            'message': 'El oponente se ha desconectado'
+        }
+        for room in left:
+            self.broadcast_to_room(room, dict(disconnect_msg))
 
-            print("📋 Estado del juego preparado para enviar:")
-            print(f"   - Tablero: {len(game_state['board'])}x{len(game_state['board'][0])}")
-            print(f"   - Jugador actual: {game_state['current_player']}")
-            print(f"   - Movimientos válidos: {len(game_state['valid_moves'])}")
-            print(f"   - Puntuación: Negro {game_state['scores']['black']}, Blanco {game_state['scores']['white']}")
-
-            self.broadcast_to_all(start_message)
-            print("✅ Mensaje de inicio enviado a ambos clientes")
-            return True
-
-        print(f"⚠️ No hay suficientes jugadores: {len(active_clients)}/2")
-        return False
-
-    def handle_client(self, client_socket, client_address, client_id):
-        print(f"👤 Cliente {client_id} conectado desde {client_address}")
+    def handle_client(self, connection):
+        client_id = connection.client_id
+        client_socket = connection.socket
+        print(f"👤 Cliente {client_id} conectado desde {connection.address}")
 
         try:
-            # Asignar color al cliente (1 para el primero, 2 para el segundo)
-            player_color = client_id + 1
-
-            with self.lock:
-                # Asegurarse de que las listas sean lo suficientemente grandes
-                while len(self.clients) <= client_id:
-                    self.clients.append(None)
-                while len(self.client_info) <= client_id:
-                    self.client_info.append(None)
-
-                self.clients[client_id] = client_socket
-                self.client_info[client_id] = {
-                    'address': client_address,
-                    'color': player_color,
-                    'connected': True
-                }
-
-            print(
-                f"✅ Cliente {client_id} registrado en lista. Total: {sum(1 for c in self.clients if c is not None)}/2")
-
-            # Enviar mensaje de bienvenida
-            welcome_msg = {
-                'type': 'welcome',
-                'player_color': int(player_color),  # Convertir a int nativo
-                'message': f'Eres el jugador {"Negro" if player_color == 1 else "Blanco"}',
-                'client_id': int(client_id)  # Convertir a int nativo
-            }
-            self.send_to_client(client_socket, welcome_msg)
-
-            # Pequeña pausa para asegurar que el cliente procesó la bienvenida
-            time.sleep(0.3)
-
-            # Verificar estado actual de conexiones
-            with self.lock:
-                active_count = sum(1 for c in self.clients if c is not None)
-
-            print(f"📊 Estado actual: {active_count}/2 jugadores activos")
-
-            if active_count == 2:
-                print("🚀 Ambos jugadores conectados, iniciando juego...")
-                # Pequeña pausa para asegurar que ambos clientes están listos
-                time.sleep(0.5)
-                self.start_game_if_ready()
-            else:
-                # Enviar mensaje de espera CON EL CONTADOR CORRECTO
-                wait_msg = {
-                    'type': 'waiting',
-                    'message': f'Esperando oponente... ({active_count}/2 jugadores)'
-                }
-                self.send_to_client(client_socket, wait_msg)
-                print(f"⏳ Cliente {client_id} en modo espera ({active_count}/2)")
+            # Nadie se sienta hasta que envía 'join' (ver process_client_message)
+            client_socket.settimeout(1)
 
             # Bucle principal para recibir mensajes
             buffer = ""
             while self.running:
                 try:
-                    data = client_socket.recv(4096).decode('utf-8')
-                    if not data:
-                        print(f"📭 Cliente {client_id} cerró la conexión")
-                        break
-
-                    buffer += data
-                    while '\n' in buffer:
-                        message_str, buffer = buffer.split('\n', 1)
-                        if message_str.strip():
-                            try:
-                                message = json.loads(message_str)
-                                print(f"📨 Mensaje de cliente {client_id}: {message['type']}")
-                                self.process_client_message(client_socket, client_id, player_color, message)
-                            except json.JSONDecodeError as e:
-                                print(f"❌ JSON inválido de cliente {client_id}: {e}")
-
+                    data = client_socket.recv(65536).decode('utf-8')
                 except socket.timeout:
                     continue
                 except Exception as e:
                     print(f"❌ Error recibiendo datos de cliente {client_id}: {e}")
                     break
+                if not data:
+                    print(f"📭 Cliente {client_id} cerró la conexión")
+                    break
+
+                buffer += data
+                while '\n' in buffer:
+                    message_str, buffer = buffer.split('\n', 1)
+                    if message_str.strip():
+                        try:
+                            message = json.loads(message_str)
+                            self.process_client_message(connection, message)
+                        except json.JSONDecodeError as e:
+                            print(f"❌ JSON inválido de cliente {client_id}: {e}")
 
         except Exception as e:
             print(f"❌ Error con cliente {client_id}: {e}")
             traceback.print_exc()
         finally:
             print(f"👋 Cliente {client_id} desconectado")
-            with self.lock:
-                if client_id < len(self.clients):
-                    self.clients[client_id] = None
-                if client_id < len(self.client_info):
-                    self.client_info[client_id] = {'connected': False}
-
             try:
                 client_socket.close()
             except:
                 pass
+            self.leave_rooms(connection)
 
-            # Notificar al otro jugador
-            disconnect_msg = {
-                'type': 'opponent_disconnected',
-                'message': 'El oponente se ha desconectado'
-            }
-            self.broadcast_to_all(disconnect_msg)
-
-    def process_client_message(self, client_socket, client_id, player_color, message):
+    def process_client_message(self, connection, message):
         msg_type = message.get('type')
 
+        if msg_type == 'join':
+            self.join_room(connection, message.get('game_id'))
+            return
+
+        if not connection.rooms:
+            self.send_to_client(connection, {'type': 'error', 'message': "envía 'join' primero"})
+            return
+
+        # Sin game_id se usa la única sala del cliente
+        game_id = message.get('game_id')
+        if game_id is None and len(connection.rooms) == 1:
+            game_id = next(iter(connection.rooms))
+        color = connection.rooms.get(game_id)
+        room = self.rooms.get(game_id)
+        if color is None or room is None:
+            self.send_to_client(connection, {'type': 'error', 'game_id': game_id, 'message': 'No estás en esa sala'})
+            return
+
         if msg_type == 'move':
             row, col = message.get('row'), message.get('col')
             if row is not None and col is not None:
-                print(f"🎯 Cliente {client_id} intenta mover a ({row}, {col})")
-                success, msg = self.make_move(row, col, player_color)
-                response = {'type': 'move_response', 'success': success, 'message': msg}
-                self.send_to_client(client_socket, response)
-                if success:
-                    print("✅ Movimiento exitoso, actualizando juego...")
-                    update_msg = {'type': 'game_update', 'game_state': self.get_game_state()}
-                    self.broadcast_to_all(update_msg)
+                with room.lock:
+                    version = room.version
+                    success, msg = room.make_move(row, col, color)
+                    changed = room.version != version  # Movimiento o caída de bandera
+                    update = room.encoded_state('game_update') if changed else None
+                    if changed:
+                        self.schedule_flag(room)
+                response = {'type': 'move_response', 'game_id': game_id, 'success': success, 'message': msg}
+                self.send_to_client(connection, response)
+                if changed:
+                    self.broadcast_encoded(room, update, 'game_update')
 
     def start(self):
         try:
             self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
+            self.server_socket.listen(128)
             self.server_socket.settimeout(1)
 
             self.running = True
@@ -324,46 +448,22 @@ class GameServer:
             while self.running:
                 try:
                     client_socket, client_address = self.server_socket.accept()
-                    client_socket.settimeout(1)
-
                     print(f"🔗 Nueva conexión de {client_address}")
 
                     with self.lock:
-                        # Buscar slot vacío
-                        slot_index = None
-                        for i in range(len(self.clients)):
-                            if self.clients[i] is None:
-                                slot_index = i
-                                break
-
-                        # Si no hay slot vacío, crear uno nuevo
-                        if slot_index is None:
-                            slot_index = len(self.clients)
-                            self.clients.append(None)
-                            self.client_info.append(None)
-
-                        print(f"🆔 Asignando slot {slot_index} al nuevo cliente")
-                        self.clients[slot_index] = client_socket
+                        connection = ClientConnection(client_socket, client_address, self.next_client_id)
+                        self.next_client_id += 1
+                        self.connections.append(connection)
 
                     # Iniciar hilo del cliente
                     client_thread = threading.Thread(
                         target=self.handle_client,
-                        args=(client_socket, client_address, slot_index),
-                        name=f"ClientThread-{slot_index}"
+                        args=(connection,),
+                        name=f"ClientThread-{connection.client_id}"
                     )
                     client_thread.daemon = True
                     client_thread.start()
 
-                    print(
-                        f"✅ Hilo del cliente {slot_index} iniciado. Total activos: {sum(1 for c in self.clients if c is not None)}/2")
-
-                    # Esperar a que el cliente se registre completamente
-                    time.sleep(0.5)
-
-                    # Verificar si podemos iniciar el juego
-                    print("🔄 Verificando estado después de nueva conexión...")
-                    self.start_game_if_ready()
-
                 except socket.timeout:
                     continue
                 except KeyboardInterrupt:
@@ -381,12 +481,13 @@ class GameServer:
         self.running = False
         if self.server_socket:
             self.server_socket.close()
-        for client in self.clients:
-            if client:
-                try:
-                    client.close()
-                except:
-                    pass
+        with self.lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.socket.close()
+            except:
+                pass
         print("🛑 Servidor detenido")
 
 
@@ -395,8 +496,12 @@ if __name__ == "__main__":
     host = input("🌐 Host [127.0.0.1]: ").strip() or '127.0.0.1'
     port_input = input("🔌 Puerto [5555]: ").strip()
     port = int(port_input) if port_input.isdigit() else 5555
+    size_input = input(f"📐 Tamaño del tablero {BOARD_SIZES} [8]: ").strip()
+    board_size = int(size_input) if size_input.isdigit() else 8
+    clock_input = input("⏱️ Reloj minutos+incremento, p. ej. 5+3 [sin reloj]: ").strip()
+    time_control = parse_time_control(clock_input) if clock_input else None
 
-    server = GameServer(host, port)
+    server = GameServer(host, port, board_size, time_control)
     try:
         server.start()
     except KeyboardInterrupt:
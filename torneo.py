@@ -0,0 +1,194 @@
+# torneo.py
+# Torneos offline entre configuraciones de la IA, sin pasar por el servidor
+#
+# Uso:
+#   python torneo.py --a depth=3 --b depth=2 --games 2000 --workers 8
+#   python torneo.py --a engine=mcts,time_limit=0.5 --b depth=3
+#   python torneo.py --a depth=3,weights_file=pesos_ia.json --b depth=3   # pesos ajustados vs de serie
+#
+# Cada apertura aleatoria se juega dos veces con los colores invertidos; las
+# partidas se reparten entre un pool de procesos y al final se informa del
+# porcentaje de victorias de A con su Elo e intervalo de confianza.
+import argparse
+import math
+import os
+import random
+import time
+from multiprocessing import Pool
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+
+import reglas
+from ia_cliente import OthelloAI
+
+# Valor z para el intervalo de confianza del 95%
+Z_95 = 1.959964
+
+
+def parse_config(text, name):
+    """Convierte 'depth=3,engine=minimax' en un diccionario de configuración."""
+    config = {'name': name}
+    for item in filter(None, text.split(',')):
+        key, value = item.split('=', 1)
+        try:
+            config[key] = int(value)
+        except ValueError:
+            try:
+                config[key] = float(value)
+            except ValueError:
+                config[key] = value
+    return config
+
+
+def make_engine(config):
+    """Crea un motor a partir de su configuración (sin mensajes por pantalla)."""
+    engine = config.get('engine', 'minimax')
+    kwargs = {k: v for k, v in config.items() if k not in ('name', 'engine')}
+    if engine == 'minimax':
+        return OthelloAI(verbose=False, **kwargs)
+    if engine == 'mcts':
+        from mcts import MCTSAI
+        return MCTSAI(verbose=False, **kwargs)
+    raise ValueError(f"Motor desconocido: {engine}")
+
+
+def random_openings(count, min_plies=4, max_plies=8, seed=0):
+    """Genera `count` aperturas distintas de entre `min_plies` y `max_plies` jugadas aleatorias."""
+    rng = random.Random(seed)
+    openings = set()
+    attempts = 0
+    while len(openings) < count and attempts < count * 50:
+        attempts += 1
+        board = reglas.initial_board()
+        player = 1
+        moves = []
+        for _ in range(rng.randint(min_plies, max_plies)):
+            legal = reglas.legal_move_list(board, player)
+            if not legal:
+                break
+            move = rng.choice(legal)
+            moves.append(move)
+            boards, players, game_over = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+            board, player = boards[0], int(players[0])
+            if game_over[0]:
+                break
+        openings.add(tuple(moves))
+    return sorted(openings)
+
+
+# Motores cacheados por proceso del pool (se crean una sola vez por worker)
+_engines = {}
+
+
+def get_engine(config):
+    key = tuple(sorted(config.items()))
+    if key not in _engines:
+        _engines[key] = make_engine(config)
+    return _engines[key]
+
+
+def play_game(opening, black_config, white_config):
+    """Juega una partida completa y devuelve (fichas negras, fichas blancas)."""
+    engines = {1: get_engine(black_config), 2: get_engine(white_config)}
+    engines[1].set_player_color(1)
+    engines[2].set_player_color(2)
+
+    board = reglas.initial_board()
+    player = 1
+    game_over = False
+    for move in opening:
+        boards, players, over = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+        board, player, game_over = boards[0], int(players[0]), bool(over[0])
+
+    while not game_over:
+        legal = reglas.legal_move_list(board, player)
+        move = engines[player].get_best_move(board.tolist())
+        if move not in legal:
+            move = legal[0]
+        boards, players, over = reglas.advance_batch(board[np.newaxis], player, np.array([move]))
+        board, player, game_over = boards[0], int(players[0]), bool(over[0])
+
+    black, white = reglas.disc_counts_batch(board[np.newaxis])[0]
+    return int(black), int(white)
+
+
+def _play_task(task):
+    opening, a_is_black, config_a, config_b = task
+    if a_is_black:
+        black, white = play_game(opening, config_a, config_b)
+        return int(np.sign(black - white))
+    black, white = play_game(opening, config_b, config_a)
+    return int(np.sign(white - black))
+
+
+def elo_from_score(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(results):
+    """Resultados (+1/0/-1 desde el punto de vista de A) -> estadísticas del match."""
+    results = np.asarray(results)
+    games = len(results)
+    wins = int(np.sum(results > 0))
+    draws = int(np.sum(results == 0))
+    losses = int(np.sum(results < 0))
+    points = (results + 1) / 2
+    score = float(points.mean()) if games else 0.5
+    stderr = float(points.std() / math.sqrt(games)) if games else 0.0
+    return {
+        'games': games,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'score': score,
+        'elo': elo_from_score(score),
+        'elo_low': elo_from_score(score - Z_95 * stderr),
+        'elo_high': elo_from_score(score + Z_95 * stderr),
+    }
+
+
+def run_tournament(config_a, config_b, games=1000, workers=None, seed=0):
+    """Juega `games` partidas (pares de aperturas con colores invertidos) en paralelo."""
+    openings = random_openings((games + 1) // 2, seed=seed)
+    tasks = []
+    for opening in openings:
+        tasks.append((opening, True, config_a, config_b))
+        tasks.append((opening, False, config_a, config_b))
+    tasks = tasks[:games]
+
+    workers = workers or os.cpu_count()
+    chunksize = max(1, len(tasks) // (workers * 8))
+    with Pool(workers) as pool:
+        results = list(pool.imap_unordered(_play_task, tasks, chunksize=chunksize))
+    return summarize(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Torneo offline entre dos configuraciones de la IA")
+    parser.add_argument('--a', default='depth=3', help="configuración A, p. ej. depth=3")
+    parser.add_argument('--b', default='depth=2', help="configuración B, p. ej. depth=2")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config_a = parse_config(args.a, 'A')
+    config_b = parse_config(args.b, 'B')
+
+    print("=== 🏆 TORNEO OTHELLO ===")
+    print(f"A: {config_a}")
+    print(f"B: {config_b}")
+    start_time = time.time()
+    stats = run_tournament(config_a, config_b, args.games, args.workers, args.seed)
+    elapsed = time.time() - start_time
+
+    print(f"🎲 Partidas: {stats['games']} en {elapsed:.1f}s")
+    print(f"📊 A: +{stats['wins']} ={stats['draws']} -{stats['losses']} ({stats['score'] * 100:.1f}%)")
+    print(f"📈 Elo A-B: {stats['elo']:+.0f} (IC 95%: {stats['elo_low']:+.0f} .. {stats['elo_high']:+.0f})")
+
+
+if __name__ == "__main__":
+    main()